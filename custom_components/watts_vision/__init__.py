@@ -11,40 +11,87 @@ from homeassistant.const import (
     Platform,
 )
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.event import async_track_time_interval
-
-from .const import API_CLIENT, DOMAIN
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+
+from .const import (
+    API_CLIENT,
+    CONF_CONDITIONAL_REFRESH,
+    CONF_MAX_DATA_AGE,
+    COORDINATOR,
+    DEFAULT_MAX_DATA_AGE,
+    DEFAULT_MAX_IN_FLIGHT_REQUESTS,
+    DOMAIN,
+    METRICS_VIEW,
+    SCHEDULER,
+    SNAPSHOT_STORAGE_KEY,
+    STORAGE_VERSION,
+    TOKEN_STORAGE_KEY,
+)
+from .coordinator import WattsVisionCoordinator
+from .metrics_view import WattsVisionMetricsView
+from .request_scheduler import RequestScheduler
 from .watts_api import WattsApi
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = [Platform.BINARY_SENSOR, Platform.SENSOR, Platform.CLIMATE]
 
+# Fractional part of the golden ratio, spreads any number of accounts evenly
+_PHASE_STEP = 0.6180339887
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up Watts Vision from a config entry."""
-    _LOGGER.debug("Set up Watts Vision")
-    hass.data.setdefault(DOMAIN, {})
 
-    client = WattsApi(hass, entry.data[CONF_USERNAME], entry.data[CONF_PASSWORD])
+def _refresh_phase(hass: HomeAssistant, entry: ConfigEntry, interval: timedelta):
+    """Return the offset of the refresh cycle of an account within the interval."""
+    entry_ids = [other.entry_id for other in hass.config_entries.async_entries(DOMAIN)]
+    index = entry_ids.index(entry.entry_id) if entry.entry_id in entry_ids else 0
+    return interval * (index * _PHASE_STEP % 1)
+
 
-    try:
-        await hass.async_add_executor_job(client.getLoginToken)
-    except Exception as exception:  # pylint: disable=broad-except
-        _LOGGER.exception(exception)
-        return False
+def _async_set_unique_id(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Give entries created before the config flow set one the id of their account."""
+    if entry.unique_id is not None:
+        return
+    unique_id = slugify(entry.data[CONF_USERNAME])
+    if hass.config_entries.async_entry_for_domain_unique_id(DOMAIN, unique_id) is None:
+        hass.config_entries.async_update_entry(entry, unique_id=unique_id)
+    else:
+        _LOGGER.warning(
+            "Account %s is configured more than once, remove the duplicate entry",
+            entry.data[CONF_USERNAME],
+        )
 
-    await hass.async_add_executor_job(client.loadData)
 
-    hass.data[DOMAIN][API_CLIENT] = client
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up Watts Vision from a config entry."""
+    _LOGGER.debug("Set up Watts Vision")
+    hass.data.setdefault(DOMAIN, {})
+    _async_set_unique_id(hass, entry)
+    # All accounts share the HTTP connection pool and the outbound request slots
+    scheduler = hass.data[DOMAIN].setdefault(
+        SCHEDULER, RequestScheduler(DEFAULT_MAX_IN_FLIGHT_REQUESTS)
+    )
 
-    hass.async_create_task(
-        hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    client = WattsApi(
+        hass,
+        entry.data[CONF_USERNAME],
+        entry.data[CONF_PASSWORD],
+        scheduler=scheduler,
     )
+    # Stops the background token refresh on unload and on a failed setup
+    entry.async_on_unload(client.close)
 
-    async def refresh_devices(event_time):
-        _LOGGER.debug("Refreshing devices")
-        await hass.async_add_executor_job(client.reloadDevices)
+    # Reuse the tokens of a previous run, a login only happens when they expired
+    await client.async_load_tokens()
+    restored = await client.async_load_snapshot()
+
+    if not restored:
+        try:
+            await client.getLoginToken()
+        except Exception as exception:  # pylint: disable=broad-except
+            _LOGGER.exception(exception)
+            return False
 
     # If scan interval is not found in config, set it to 300 seconds
     if CONF_SCAN_INTERVAL not in entry.data:
@@ -55,8 +102,56 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     SCAN_INTERVAL = timedelta(seconds=interval)
 
+    # Conditional refresh only reads homes whose central unit reported new data
+    max_data_age = None
+    if entry.data.get(CONF_CONDITIONAL_REFRESH, False):
+        max_data_age = timedelta(
+            seconds=entry.data.get(CONF_MAX_DATA_AGE, DEFAULT_MAX_DATA_AGE)
+        )
+
     _LOGGER.debug("Setting up refresh interval to %s", SCAN_INTERVAL)
-    async_track_time_interval(hass, refresh_devices, SCAN_INTERVAL)
+    coordinator = WattsVisionCoordinator(
+        hass,
+        entry,
+        client,
+        SCAN_INTERVAL,
+        phase=_refresh_phase(hass, entry, SCAN_INTERVAL),
+        max_data_age=max_data_age,
+    )
+    if restored:
+        # Create the entities from the snapshot and reconcile in the background
+        coordinator.async_use_snapshot()
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), "watts_vision initial refresh"
+        )
+    else:
+        await coordinator.async_config_entry_first_refresh()
+
+    hass.data[DOMAIN][entry.entry_id] = {
+        API_CLIENT: client,
+        COORDINATOR: coordinator,
+    }
+
+    # Thermostats link to their central unit, so it has to exist first
+    device_registry = dr.async_get(hass)
+    for home in coordinator.topology.homes:
+        device_registry.async_get_or_create(
+            config_entry_id=entry.entry_id, **home.device_info
+        )
+
+    # Views cannot be removed, so the metrics view outlives config entry reloads
+    if "http" in hass.config.components and METRICS_VIEW not in hass.data[DOMAIN]:
+        hass.http.register_view(WattsVisionMetricsView)
+        hass.data[DOMAIN][METRICS_VIEW] = True
+
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    # One batched fetch for all central units, without holding up the setup
+    entry.async_create_background_task(
+        hass,
+        coordinator.async_load_last_communication(),
+        "watts_vision last communication",
+    )
 
     return True
 
@@ -65,5 +160,20 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     _LOGGER.debug("Unloading Watts Vision")
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(API_CLIENT)
+        hass.data[DOMAIN].pop(entry.entry_id)
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the persisted tokens and snapshot of a removed config entry."""
+    username = slugify(entry.data[CONF_USERNAME])
+    if any(
+        slugify(other.data[CONF_USERNAME]) == username
+        for other in hass.config_entries.async_entries(DOMAIN)
+        if other.entry_id != entry.entry_id
+    ):
+        # A duplicate entry of the account still uses them
+        return
+    for key in (TOKEN_STORAGE_KEY, SNAPSHOT_STORAGE_KEY):
+        store = Store(hass, STORAGE_VERSION, key.format(username), private=True)
+        await store.async_remove()
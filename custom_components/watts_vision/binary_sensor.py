@@ -1,65 +1,46 @@
 import logging
 from collections.abc import Callable
-from datetime import timedelta
 
 from homeassistant.components.binary_sensor import BinarySensorEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
-from .const import API_CLIENT, DOMAIN
-from .watts_api import WattsApi
+from .const import COORDINATOR, DOMAIN
+from .coordinator import WattsVisionCoordinator
+from .entity import WattsVisionEntity
+from .topology import Thermostat
 
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = timedelta(seconds=120)
-
 
 async def async_setup_entry(
     hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities: Callable
 ):
     """Set up the binary_sensor platform."""
-    wattsClient: WattsApi = hass.data[DOMAIN][API_CLIENT]
-
-    smartHomes = wattsClient.getSmartHomes()
+    coordinator: WattsVisionCoordinator = hass.data[DOMAIN][config_entry.entry_id][
+        COORDINATOR
+    ]
 
-    sensors = []
+    sensors = [
+        WattsVisionHeatingBinarySensor(coordinator, thermostat)
+        for thermostat in coordinator.topology.thermostats
+    ]
 
-    if smartHomes is not None:
-        for y in range(len(smartHomes)):
-            if smartHomes[y]["zones"] is not None:
-                for z in range(len(smartHomes[y]["zones"])):
-                    if smartHomes[y]["zones"][z]["devices"] is not None:
-                        for x in range(len(smartHomes[y]["zones"][z]["devices"])):
-                            sensors.append(
-                                WattsVisionHeatingBinarySensor(
-                                    wattsClient,
-                                    smartHomes[y]["smarthome_id"],
-                                    smartHomes[y]["zones"][z]["devices"][x]["id"],
-                                    smartHomes[y]["zones"][z]["zone_label"],
-                                )
-                            )
+    async_add_entities(sensors)
 
-    async_add_entities(sensors, update_before_add=True)
 
-
-class WattsVisionHeatingBinarySensor(BinarySensorEntity):
+class WattsVisionHeatingBinarySensor(WattsVisionEntity, BinarySensorEntity):
     """Representation of a Watts Vision thermostat."""
 
-    def __init__(self, wattsClient: WattsApi, smartHome: str, id: str, zone: str):
-        super().__init__()
-        self.client = wattsClient
-        self.smartHome = smartHome
-        self.id = id
-        self.zone = zone
-        self._name = zone + " Heating"
+    _watched_fields = frozenset(["heating_up"])
+    _unique_id_prefix = "thermostat_is_heating_"
+
+    def __init__(self, coordinator: WattsVisionCoordinator, thermostat: Thermostat):
+        super().__init__(coordinator, thermostat)
+        self._name = self.zone + " Heating"
         self._state: bool = False
         self._available = True
 
-    @property
-    def unique_id(self) -> str:
-        """Return the unique ID of the sensor."""
-        return "thermostat_is_heating_" + self.id
-
     @property
     def name(self) -> str:
         """Return the name of the entity."""
@@ -70,26 +51,9 @@ class WattsVisionHeatingBinarySensor(BinarySensorEntity):
         """Return the state of the sensor."""
         return self._state
 
-    @property
-    def device_info(self):
-        return {
-            "identifiers": {
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, self.id)
-            },
-            "manufacturer": "Watts",
-            "name": "Thermostat " + self.zone,
-            "model": "BT-D03-RF",
-            "via_device": (DOMAIN, self.smartHome),
-        }
+    def _update_attrs(self):
+        device = self.client.getDeviceState(self.smartHome, self.id)
+        if device is None:
+            return
 
-    async def async_update(self):
-        # try:
-        smartHomeDevice = self.client.getDevice(self.smartHome, self.id)
-        if smartHomeDevice["heating_up"] == "0":
-            self._state = False
-        else:
-            self._state = True
-        # except:
-        #     self._available = False
-        #     _LOGGER.exception("Error retrieving data.")
+        self._state = device.heating
@@ -1,28 +1,30 @@
 """Watts Vision sensor platform -- central unit."""
 
-from homeassistant.components.sensor import SensorEntity
+from datetime import timedelta
 
-from .const import DOMAIN
-from .watts_api import WattsApi
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from .const import LAST_COMMUNICATION_MARGIN
+from .coordinator import WattsVisionCoordinator
+from .topology import Home
 
-class WattsVisionLastCommunicationSensor(SensorEntity):
-    def __init__(
-        self, wattsClient: WattsApi, smartHome: str, label: str, mac_address: str
-    ):
-        super().__init__()
-        self.client = wattsClient
-        self.smartHome = smartHome
-        self._label = label
+
+class WattsVisionLastCommunicationSensor(
+    CoordinatorEntity[WattsVisionCoordinator], SensorEntity
+):
+    def __init__(self, coordinator: WattsVisionCoordinator, home: Home):
+        super().__init__(coordinator)
+        self.client = coordinator.client
+        self.smartHome = home.smarthome_id
+        self._label = home.label
         self._name = "Last communication " + self._label
         self._state = None
         self._available = True
-        self._mac_address = mac_address
-
-    @property
-    def unique_id(self) -> str:
-        """Return the unique ID of the sensor."""
-        return "last_communication_" + self.smartHome
+        self._attr_unique_id = "last_communication_" + self.smartHome
+        self._attr_device_info = home.device_info
+        self._written_available = None
 
     @property
     def name(self) -> str:
@@ -30,30 +32,37 @@ class WattsVisionLastCommunicationSensor(SensorEntity):
         return self._name
 
     @property
-    def state(self) -> str | None:
-        return self._state
+    def device_class(self):
+        return SensorDeviceClass.TIMESTAMP
 
     @property
-    def device_info(self):
-        return {
-            "identifiers": {
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, self.smartHome)
-            },
-            "manufacturer": "Watts",
-            "name": "Central Unit " + self._label,
-            "model": "BT-CT02-RF",
-            "connections": {("mac", self._mac_address)},
-        }
-
-    async def async_update(self):
-        data = await self.hass.async_add_executor_job(
-            self.client.getLastCommunication, self.smartHome
-        )
-
-        self._state = "{} days, {} hours, {} minutes and {} seconds.".format(
-            data["diffObj"]["days"],
-            data["diffObj"]["hours"],
-            data["diffObj"]["minutes"],
-            data["diffObj"]["seconds"],
-        )
+    def native_value(self):
+        # A timestamp keeps its age current in the frontend without new fetches
+        return self._state
+
+    async def async_added_to_hass(self) -> None:
+        """Set the initial state from the data already loaded."""
+        await super().async_added_to_hass()
+        self._written_available = self.available
+        self._state = self._fetched_time()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only when a new timestamp was fetched."""
+        state = self._fetched_time()
+        if self._is_same_time(state) and self.available == self._written_available:
+            return
+        self._written_available = self.available
+        self._state = state
+        super()._handle_coordinator_update()
+
+    def _fetched_time(self):
+        """Return the fetched last communication time, to the second."""
+        state = self.client.getLastCommunicationTime(self.smartHome)
+        return state.replace(microsecond=0) if state is not None else None
+
+    def _is_same_time(self, state) -> bool:
+        """Return True when state only differs by the latency of the fetch."""
+        if state is None or self._state is None:
+            return state == self._state
+        return abs(state - self._state) < timedelta(seconds=LAST_COMMUNICATION_MARGIN)
@@ -1,4 +1,3 @@
-import functools
 import logging
 from collections.abc import Callable
 
@@ -14,7 +13,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
 from .const import (
-    API_CLIENT,
+    COORDINATOR,
     DOMAIN,
     _AVAILABLE_HEAT_MODES,
     _AVAILABLE_TEMP_TYPES,
@@ -22,8 +21,11 @@ from .const import (
     _TEMP_TYPE_TO_DEVICE,
     _HEAT_MODE_TO_DEVICE,
     HeatMode,
+    TempType,
 )
-from .watts_api import WattsApi
+from .coordinator import WattsVisionCoordinator
+from .entity import WattsVisionEntity
+from .topology import Thermostat
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,54 +34,42 @@ async def async_setup_entry(
     hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities: Callable
 ):
     """Set up the climate platform."""
-    wattsClient: WattsApi = hass.data[DOMAIN][API_CLIENT]
-
-    smartHomes = wattsClient.getSmartHomes()
-
-    devices = []
-
-    if smartHomes is not None:
-        for y in range(len(smartHomes)):
-            if smartHomes[y]["zones"] is not None:
-                for z in range(len(smartHomes[y]["zones"])):
-                    if smartHomes[y]["zones"][z]["devices"] is not None:
-                        for x in range(len(smartHomes[y]["zones"][z]["devices"])):
-                            devices.append(
-                                WattsThermostat(
-                                    wattsClient,
-                                    smartHomes[y]["smarthome_id"],
-                                    smartHomes[y]["zones"][z]["devices"][x]["id"],
-                                    smartHomes[y]["zones"][z]["devices"][x][
-                                        "id_device"
-                                    ],
-                                    smartHomes[y]["zones"][z]["zone_label"],
-                                )
-                            )
-
-    async_add_entities(devices, update_before_add=True)
-
-
-class WattsThermostat(ClimateEntity):
+    coordinator: WattsVisionCoordinator = hass.data[DOMAIN][config_entry.entry_id][
+        COORDINATOR
+    ]
+
+    devices = [
+        WattsThermostat(coordinator, thermostat)
+        for thermostat in coordinator.topology.thermostats
+    ]
+
+    async_add_entities(devices)
+
+
+class WattsThermostat(WattsVisionEntity, ClimateEntity):
     """"""
 
-    def __init__(
-        self, wattsClient: WattsApi, smartHome: str, id: str, deviceID: str, zone: str
-    ):
-        super().__init__()
-        self.client = wattsClient
-        self.smartHome = smartHome
-        self.id = id
-        self.zone = zone
-        self.deviceID = deviceID
-        self._name = zone + " Thermostat"
+    _watched_fields = frozenset(
+        [
+            "temperature_air",
+            "min_set_point",
+            "max_set_point",
+            "heating_up",
+            "heat_cool",
+            "gv_mode",
+        ]
+        + [_TEMP_TYPE_TO_DEVICE[mode] for mode in _AVAILABLE_TEMP_TYPES]
+        + [_TEMP_TYPE_TO_DEVICE[TempType.MANUAL]]
+    )
+    _unique_id_prefix = "watts_thermostat_"
+
+    def __init__(self, coordinator: WattsVisionCoordinator, thermostat: Thermostat):
+        super().__init__(coordinator, thermostat)
+        self.deviceID = thermostat.id_device
+        self._name = self.zone + " Thermostat"
         self._available = True
         self._attr_extra_state_attributes = {"previous_gv_mode": "0"}
 
-    @property
-    def unique_id(self):
-        """Return the unique ID for this device."""
-        return "watts_thermostat_" + self.id
-
     @property
     def name(self) -> str:
         """Return the name of the entity."""
@@ -116,82 +106,65 @@ class WattsThermostat(ClimateEntity):
     def preset_mode(self) -> str:
         return self._attr_preset_mode
 
-    @property
-    def device_info(self):
-        return {
-            "identifiers": {
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, self.id)
-            },
-            "manufacturer": "Watts",
-            "name": "Thermostat " + self.zone,
-            "model": "BT-D03-RF",
-            "via_device": (DOMAIN, self.smartHome),
-        }
-
-    async def async_update(self):
-        # try:
-        smartHomeDevice = self.client.getDevice(self.smartHome, self.id)
-
-        self._attr_current_temperature = float(smartHomeDevice["temperature_air"]) / 10
-        if smartHomeDevice["gv_mode"] != "2":
-            self._attr_min_temp = float(smartHomeDevice["min_set_point"]) / 10
-            self._attr_max_temp = float(smartHomeDevice["max_set_point"]) / 10
+    def _update_attrs(self):
+        device = self.client.getDeviceState(self.smartHome, self.id)
+        if device is None:
+            return
+
+        self._attr_current_temperature = device.temperature_air
+        if device.heat_mode != HeatMode.FROST:
+            self._attr_min_temp = device.min_set_point
+            self._attr_max_temp = device.max_set_point
         else:
             self._attr_min_temp = float(446 / 10)
             self._attr_max_temp = float(446 / 10)
 
-        if smartHomeDevice["heating_up"] == "0":
-            if smartHomeDevice["gv_mode"] == "1":
+        if not device.heating:
+            if device.heat_mode == HeatMode.OFF:
                 self._attr_hvac_action = HVACAction.OFF
             else:
                 self._attr_hvac_action = HVACAction.IDLE
-        elif smartHomeDevice["heat_cool"] == "1":
+        elif device.cooling:
             self._attr_hvac_action = HVACAction.COOLING
         else:
             self._attr_hvac_action = HVACAction.HEATING
 
-        self._attr_preset_mode = _DEVICE_TO_MODE_TYPE[smartHomeDevice["gv_mode"]].heat_mode.value
+        self._attr_preset_mode = (
+            device.heat_mode.value if device.heat_mode is not None else None
+        )
 
-        if smartHomeDevice["gv_mode"] == "1":
+        if device.heat_mode == HeatMode.OFF:
             self._attr_hvac_mode = HVACMode.OFF
             self._attr_target_temperature = None
             targettemp = 0
         else:
-            if smartHomeDevice["heat_cool"] == "1":
+            if device.cooling:
                 self._attr_hvac_mode = HVACMode.COOL
             else:
                 self._attr_hvac_mode = HVACMode.HEAT
-            consigne = _TEMP_TYPE_TO_DEVICE[_DEVICE_TO_MODE_TYPE[smartHomeDevice["gv_mode"]].temp_type]
-            self._attr_target_temperature = float(smartHomeDevice[consigne]) / 10
+            self._attr_target_temperature = device.target_temperature
             targettemp = self._attr_target_temperature
 
         logstring = f"Update: {self._name} targettemp={targettemp}"
         for consigne in [_TEMP_TYPE_TO_DEVICE[mode] for mode in _AVAILABLE_TEMP_TYPES]:
-            self._attr_extra_state_attributes[consigne] = (
-                float(smartHomeDevice[consigne]) / 10
-            )
+            self._attr_extra_state_attributes[consigne] = getattr(device, consigne)
             logstring += (
                 f" {consigne[9:]}={self._attr_extra_state_attributes[consigne]}"
             )
         _LOGGER.debug(logstring)
 
-        self._attr_extra_state_attributes["gv_mode"] = smartHomeDevice["gv_mode"]
+        self._attr_extra_state_attributes["gv_mode"] = device.gv_mode
         _LOGGER.debug(
             "Update: {} air={} heat_mode {} temp_type {} min {} max {}".format(
                 self._name,
                 self._attr_current_temperature,
-                _DEVICE_TO_MODE_TYPE[smartHomeDevice["gv_mode"]].heat_mode,
-                _DEVICE_TO_MODE_TYPE[smartHomeDevice["gv_mode"]].temp_type,
+                device.heat_mode,
+                device.temp_type,
                 self._attr_min_temp,
                 self._attr_max_temp,
             )
         )
 
-        # except:
-        #     self._available = False
-        #     _LOGGER.exception("Error retrieving data.")
-
     async def async_set_hvac_mode(self, hvac_mode):
         """Set new target hvac mode."""
         mode = self._attr_extra_state_attributes["previous_gv_mode"]
@@ -199,6 +172,10 @@ class WattsThermostat(ClimateEntity):
             if mode == "1":
                 consigne = "Off"
                 value = 0
+            elif mode not in _DEVICE_TO_MODE_TYPE:
+                raise HomeAssistantError(
+                    f"Unable to restore unknown mode {mode} of {self._name}."
+                )
             else:
                 consigne = _TEMP_TYPE_TO_DEVICE[_DEVICE_TO_MODE_TYPE[mode].temp_type]
                 value = int(self._attr_extra_state_attributes[consigne])
@@ -220,14 +197,7 @@ class WattsThermostat(ClimateEntity):
         value = str(value * 10)
 
         # reloading the devices may take some time, meanwhile set the new values manually
-        smartHomeDevice = self.client.getDevice(self.smartHome, self.id)
-        smartHomeDevice["consigne_manuel"] = value
-        smartHomeDevice["gv_mode"] = mode
-
-        func = functools.partial(
-            self.client.pushTemperature, self.smartHome, self.deviceID, value, mode
-        )
-        await self.hass.async_add_executor_job(func)
+        await self._async_push(value, mode)
 
     async def async_set_preset_mode(self, preset_mode):
         """Set new target preset mode."""
@@ -256,34 +226,28 @@ class WattsThermostat(ClimateEntity):
             )
 
         # reloading the devices may take some time, meanwhile set the new values manually
-        smartHomeDevice = self.client.getDevice(self.smartHome, self.id)
-        smartHomeDevice["consigne_manuel"] = value
-        smartHomeDevice["gv_mode"] = gv_mode
-
-        func = functools.partial(
-            self.client.pushTemperature,
-            self.smartHome,
-            self.deviceID,
-            value,
-            gv_mode,
-        )
-        await self.hass.async_add_executor_job(func)
+        await self._async_push(value, gv_mode)
 
     async def async_set_temperature(self, **kwargs):
         """Set new target temperature."""
         value = int(kwargs["temperature"])
 
-        # Get the smartHomeDevice
-        smartHomeDevice = self.client.getDevice(self.smartHome, self.id)
+        device = self.client.getDeviceState(self.smartHome, self.id)
+        if device is None:
+            raise HomeAssistantError(f"No data available for {self._name}.")
 
-        gvMode = smartHomeDevice["gv_mode"]
-        if _DEVICE_TO_MODE_TYPE[gvMode].heat_mode == HeatMode.PROGRAM:
+        gvMode = device.gv_mode
+        if device.heat_mode == HeatMode.PROGRAM:
             # This is not accepted by Watts!
             raise HomeAssistantError(
-                f"Setting temperature is not supported in {_DEVICE_TO_MODE_TYPE[gvMode].heat_mode.value} mode."
+                f"Setting temperature is not supported in {device.heat_mode.value} mode."
+            )
+        if device.heat_mode is None:
+            raise HomeAssistantError(
+                f"Setting temperature is not supported in unknown mode {gvMode}."
             )
 
-        temp_type = _DEVICE_TO_MODE_TYPE[gvMode].temp_type
+        temp_type = device.temp_type
 
         _LOGGER.debug(
             f"Set a-temperature to {value} for device {self._name} in temp_type {temp_type} - min {self._attr_min_temp} max {self._attr_max_temp}"
@@ -296,14 +260,24 @@ class WattsThermostat(ClimateEntity):
         )
 
         # update its temp settings
-        smartHomeDevice["consigne_manuel"] = value
-        smartHomeDevice[_TEMP_TYPE_TO_DEVICE[_DEVICE_TO_MODE_TYPE[gvMode].temp_type]] = value
+        await self._async_push(value, str(gvMode))
 
-        # Set the smartHomeDevice using the just altered SmartHomeDevice
-        # self.client.setDevice(self.smartHome, self.id, smartHomeDevice)
-
-        func = functools.partial(
-            self.client.pushTemperature, self.smartHome, self.deviceID, value, str(gvMode)
+    async def _async_push(self, value: str, gvMode: str):
+        """Show the written fields right away and push them to the device."""
+        self.coordinator.async_notify_changed(
+            self.client.setPendingWrite(self.smartHome, self.id, value, gvMode)
         )
 
-        await self.hass.async_add_executor_job(func)
+        try:
+            result = await self.coordinator.commands.async_push_temperature(
+                self.smartHome, self.deviceID, value, gvMode
+            )
+        except Exception:
+            # The write never reached the cloud, let a refresh restore the state
+            self.client.discardPendingWrite(self.smartHome, self.id)
+            self.coordinator.async_activity(self.smartHome)
+            raise
+        if not result:
+            # Let the next refresh restore the actual state
+            self.client.discardPendingWrite(self.smartHome, self.id)
+        self.coordinator.async_activity(self.smartHome)
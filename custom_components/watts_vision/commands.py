@@ -0,0 +1,94 @@
+"""Debounced command pipeline for Watts Vision thermostat writes."""
+
+import asyncio
+import functools
+import logging
+from datetime import datetime
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import async_call_later
+
+from .const import DEFAULT_COMMAND_DELAY
+from .watts_api import WattsApi
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _PendingCommand:
+    """The latest requested state of a device and everyone waiting for it."""
+
+    def __init__(self):
+        self.value = None
+        self.gvMode = None
+        self.futures: list[asyncio.Future] = []
+        self.cancel = None
+
+
+class CommandQueue:
+    """
+    Coalesces rapid successive writes to a device into a single push.
+
+    Each write restarts the quiet window of its device. Once the window
+    passes without new writes, only the last requested state is pushed and
+    every caller receives the result of that push.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: WattsApi,
+        delay: float = DEFAULT_COMMAND_DELAY,
+    ):
+        self._hass = hass
+        self._client = client
+        self._delay = delay
+        self._pending: dict[tuple[str, str], _PendingCommand] = {}
+
+    async def async_push_temperature(
+        self, smarthome: str, deviceID: str, value: str, gvMode: str
+    ) -> bool:
+        """Queue a pushTemperature and wait for the coalesced result."""
+        key = (smarthome, deviceID)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _PendingCommand()
+        else:
+            _LOGGER.debug(f"Coalescing command for device {deviceID}")
+            pending.cancel()
+
+        pending.value = value
+        pending.gvMode = gvMode
+        future = self._hass.loop.create_future()
+        pending.futures.append(future)
+        pending.cancel = async_call_later(
+            self._hass, self._delay, functools.partial(self._async_flush, key)
+        )
+
+        return await future
+
+    async def _async_flush(self, key: tuple[str, str], _now: datetime | None = None):
+        """Push the last requested state of a device."""
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+
+        smarthome, deviceID = key
+        try:
+            result = await self._client.pushTemperature(
+                smarthome, deviceID, pending.value, pending.gvMode
+            )
+        except Exception as exception:  # pylint: disable=broad-except
+            for future in pending.futures:
+                if not future.done():
+                    future.set_exception(exception)
+            return
+
+        for future in pending.futures:
+            if not future.done():
+                future.set_result(result)
+
+    async def async_flush_all(self) -> None:
+        """Push all queued commands right away."""
+        for key, pending in list(self._pending.items()):
+            pending.cancel()
+            await self._async_flush(key)
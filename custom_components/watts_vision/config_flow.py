@@ -5,8 +5,15 @@ from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD, CONF_SCAN_INTERVAL, CONF_USERNAME
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
-
-from .const import DOMAIN, LOGGER
+from homeassistant.util import slugify
+
+from .const import (
+    CONF_CONDITIONAL_REFRESH,
+    CONF_MAX_DATA_AGE,
+    DEFAULT_MAX_DATA_AGE,
+    DOMAIN,
+    LOGGER,
+)
 from .watts_api import WattsApi
 
 # Schema for registering an account with the WattsVision API
@@ -16,7 +23,11 @@ register_schema = vol.Schema(
 
 # Schema for configuring the Watts Vision integration
 option_schema = vol.Schema(
-    {vol.Optional(CONF_SCAN_INTERVAL, description={"suggested_value": 300}): int}
+    {
+        vol.Optional(CONF_SCAN_INTERVAL, description={"suggested_value": 300}): int,
+        vol.Optional(CONF_CONDITIONAL_REFRESH, default=False): bool,
+        vol.Optional(CONF_MAX_DATA_AGE, default=DEFAULT_MAX_DATA_AGE): int,
+    }
 )
 
 
@@ -53,6 +64,9 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             LOGGER.debug(
                 "[ConfigFlow] [async_step_user] user_input submitted %s", user_input
             )
+            # The persisted tokens and snapshot are shared by entries of one account
+            await self.async_set_unique_id(slugify(user_input[CONF_USERNAME]))
+            self._abort_if_unique_id_configured()
             if await self.validate_input_user(user_input) is False:
                 LOGGER.debug("[ConfigFlow] [user] user_input validation failed")
                 LOGGER.debug("[ConfigFlow] [user] errors: %s", self.errors)
@@ -82,9 +96,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         api = WattsApi(self.hass, user_input[CONF_USERNAME], user_input[CONF_PASSWORD])
 
         try:
-            authenticated = await self.hass.async_add_executor_job(
-                api.test_authentication
-            )
+            authenticated = await api.test_authentication()
+            api.close()
         # pylint: disable=broad-except
         except Exception as exception:
             LOGGER.exception(
@@ -161,6 +174,12 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input[CONF_SCAN_INTERVAL] > 86400:
             self.errors = {CONF_SCAN_INTERVAL: "scan_interval_too_high"}
             return False
+        if (
+            user_input[CONF_CONDITIONAL_REFRESH]
+            and user_input[CONF_MAX_DATA_AGE] < user_input[CONF_SCAN_INTERVAL]
+        ):
+            self.errors = {CONF_MAX_DATA_AGE: "max_data_age_too_low"}
+            return False
         return True
 
     @staticmethod
@@ -217,6 +236,8 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     CONF_USERNAME: self.config_entry.data[CONF_USERNAME],
                     CONF_PASSWORD: self.config_entry.data[CONF_PASSWORD],
                     CONF_SCAN_INTERVAL: user_input[CONF_SCAN_INTERVAL],
+                    CONF_CONDITIONAL_REFRESH: user_input[CONF_CONDITIONAL_REFRESH],
+                    CONF_MAX_DATA_AGE: user_input[CONF_MAX_DATA_AGE],
                 },
             )
             if updated:
@@ -244,7 +265,19 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 {
                     vol.Optional(
                         CONF_SCAN_INTERVAL, description={"suggested_value": interval}
-                    ): int
+                    ): int,
+                    vol.Optional(
+                        CONF_CONDITIONAL_REFRESH,
+                        default=self.config_entry.data.get(
+                            CONF_CONDITIONAL_REFRESH, False
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_MAX_DATA_AGE,
+                        default=self.config_entry.data.get(
+                            CONF_MAX_DATA_AGE, DEFAULT_MAX_DATA_AGE
+                        ),
+                    ): int,
                 }
             ),
             errors=self.errors,
@@ -270,4 +303,10 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         if user_input[CONF_SCAN_INTERVAL] > 86400:
             self.errors = {CONF_SCAN_INTERVAL: "scan_interval_too_high"}
             return False
+        if (
+            user_input[CONF_CONDITIONAL_REFRESH]
+            and user_input[CONF_MAX_DATA_AGE] < user_input[CONF_SCAN_INTERVAL]
+        ):
+            self.errors = {CONF_MAX_DATA_AGE: "max_data_age_too_low"}
+            return False
         return True
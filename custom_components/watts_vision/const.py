@@ -17,10 +17,74 @@ from homeassistant.components.climate.const import (
 
 API_CLIENT = "api"
 
+CONF_CONDITIONAL_REFRESH = "conditional_refresh"
+CONF_MAX_DATA_AGE = "max_data_age"
+
+COORDINATOR = "coordinator"
+METRICS_VIEW = "metrics_view"
+SCHEDULER = "scheduler"
+
 DOMAIN = "watts_vision"
 
 LOGGER = logging.getLogger(__package__)
 
+STORAGE_VERSION = 1
+TOKEN_STORAGE_KEY = DOMAIN + ".tokens.{}"
+SNAPSHOT_STORAGE_KEY = DOMAIN + ".snapshot.{}"
+
+# Seconds to coalesce snapshot writes after a refresh
+SNAPSHOT_SAVE_DELAY = 60
+
+# Adaptive polling: seconds between refreshes right after a command or change,
+# and how long to keep polling at that pace
+FAST_POLL_INTERVAL = 30
+FAST_POLL_WINDOW = 180
+
+# Maximum number of requests per hour an account may spend on polling
+DEFAULT_REQUEST_BUDGET = 720
+
+# Random delay added to the refresh slot of a home, as a fraction of the
+# spacing between the homes of an account, 0 disables it
+DEFAULT_REFRESH_JITTER = 0.2
+
+# Homes due within this many seconds are refreshed in the same tick
+REFRESH_COALESCE_WINDOW = 1
+
+# Quiet window in seconds before coalesced thermostat writes are pushed
+DEFAULT_COMMAND_DELAY = 1.0
+
+# Seconds a written value overrides fetched data until the cloud confirms it
+PENDING_WRITE_TIMEOUT = 600
+
+# Maximum number of requests in flight to the Watts cloud at once, shared by
+# all accounts; it also bounds the per-home requests of a reload
+DEFAULT_MAX_IN_FLIGHT_REQUESTS = 4
+
+# Account-wide token bucket: burst size and refill rate in requests per second
+DEFAULT_RATE_LIMIT_CAPACITY = 30
+DEFAULT_RATE_LIMIT_RATE = 1.0
+
+# Request timeout in seconds and retries of transient failures
+REQUEST_TIMEOUT = 30
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF_BASE = 1
+RETRY_BACKOFF_MAX = 10
+
+# Consecutive failures that open the circuit breaker and its cool-down in seconds
+CIRCUIT_BREAKER_THRESHOLD = 5
+CIRCUIT_BREAKER_COOLDOWN = 60
+
+# Seconds before expiry at which the access token is refreshed in the background
+TOKEN_REFRESH_MARGIN = 30
+
+# Number of failed responses kept for the diagnostics
+RECENT_ERRORS = 20
+
+# Conditional refresh: seconds after which the devices of a home are read even
+# without new data, and the uncertainty of the last communication time
+DEFAULT_MAX_DATA_AGE = 3600
+LAST_COMMUNICATION_MARGIN = 60
+
 PRESET_DEFROST = "Frost Protection"
 PRESET_OFF = "Off"
 PRESET_PROGRAM = "Program"
@@ -75,6 +139,16 @@ _HEAT_MODE_TO_DEVICE: dict[HeatMode, str] = {
     HeatMode.OFF: "1",
 }
 
+# Setpoints a push writes in each gv_mode, None stands for the pushed value
+_PUSHED_SETPOINTS: dict[str, dict[str, str | None]] = {
+    "0": {"consigne_confort": None, "consigne_manuel": None},
+    "1": {"consigne_manuel": "0"},
+    "2": {"consigne_hg": "446", "consigne_manuel": "446"},
+    "3": {"consigne_eco": None, "consigne_manuel": None},
+    "4": {"consigne_boost": None, "consigne_manuel": None},
+    "11": {"consigne_manuel": None},
+}
+
 _HEAT_MODE_TO_WRITABLE_TEMP_TYPE: dict[HeatMode, TempType] = {
     HeatMode.ECO: TempType.ECO,
     HeatMode.FROST: TempType.FROST,
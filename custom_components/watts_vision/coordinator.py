@@ -0,0 +1,229 @@
+"""Watts Vision data update coordinator."""
+
+import logging
+import time
+from datetime import datetime, timedelta
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .commands import CommandQueue
+from .const import DOMAIN, REFRESH_COALESCE_WINDOW
+from .polling import AdaptivePollingScheduler, PhasedRefreshSchedule
+from .request_scheduler import Priority
+from .topology import Topology
+from .watts_api import WattsApi
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _merge_changes(changes: dict | None, more: dict | None) -> dict | None:
+    """Merge the changed fields per device of two reloads, None if unknown."""
+    if changes is None or more is None:
+        return None
+    return changes | more
+
+
+class WattsVisionCoordinator(DataUpdateCoordinator):
+    """Owns the fetch cycle of a Watts Vision account."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        client: WattsApi,
+        update_interval: timedelta,
+        phase: timedelta = timedelta(0),
+        max_data_age: timedelta | None = None,
+    ):
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=entry,
+            name=DOMAIN,
+            update_interval=update_interval,
+        )
+        self.client = client
+        self.commands = CommandQueue(hass, client)
+        self.polling = AdaptivePollingScheduler(update_interval)
+        # Last communication only changes slowly, fetch it at the configured pace
+        self._last_communication_interval = update_interval
+        # Last fetch per home, None until the first fetch after setup
+        self._last_communication_refresh: dict[str, datetime] | None = None
+        # Homes and thermostats the entities are created from
+        self.topology: Topology | None = None
+        # Seconds the last fetch cycle took
+        self.last_refresh_duration = None
+        # Offset of the refresh cycle, so accounts do not poll in lockstep
+        self.refresh_phase = phase
+        # Every home is refreshed on its own slot within the interval
+        self.schedule = PhasedRefreshSchedule(phase / update_interval)
+        # Only read homes with new data, at least every max_data_age; None reads all
+        self.max_data_age = max_data_age
+
+    async def _async_update_data(self):
+        """Fetch the latest device data from the Watts cloud."""
+        _LOGGER.debug("Refreshing devices")
+        if not self.client.isAvailable():
+            # Skip the poll cheaply until the cool-down allows a probe
+            raise UpdateFailed("Watts cloud unavailable, skipping refresh")
+        start = time.monotonic()
+        # Homes refreshed by this run, None while the full account is read
+        smarthomes = None
+        try:
+            if self.topology is None or self.client.isStale():
+                # Restored or missing topology, read the full account
+                await self.client.loadData(Priority.BACKGROUND)
+                if not self.client.isStale():
+                    self._reconcile_topology()
+                changes = self.client.getChanges()
+            else:
+                # Homes with a recent command or change are polled quickly
+                active = self.polling.active_homes & set(self._smarthome_ids())
+                due = self._due_smarthomes(active)
+                smarthomes = active | due
+                changes = {}
+                if active:
+                    # Reads confirming a command go before background refreshes
+                    await self.client.reloadDevices(Priority.CONFIRM, active)
+                    changes = self.client.getChanges()
+                if due and self.max_data_age is not None:
+                    # Checks the last communication of the due homes on the way
+                    await self.client.reloadChangedDevices(
+                        Priority.BACKGROUND, due, self.max_data_age
+                    )
+                    changes = _merge_changes(changes, self.client.getChanges())
+                elif due:
+                    await self.client.reloadDevices(Priority.BACKGROUND, due)
+                    changes = _merge_changes(changes, self.client.getChanges())
+            # The first fetch happens after setup, see async_load_last_communication
+            if (
+                self._last_communication_refresh is not None
+                and self.max_data_age is None
+            ):
+                await self._async_refresh_last_communication(smarthomes)
+        except Exception as exception:  # pylint: disable=broad-except
+            raise UpdateFailed(f"Error refreshing devices: {exception}") from exception
+        else:
+            # A full read reports every device as changed, it is no activity
+            if smarthomes is not None and changes:
+                heating = {
+                    key[0] for key, fields in changes.items() if "heating_up" in fields
+                }
+                if heating:
+                    self.polling.activity(heating)
+        finally:
+            self.last_refresh_duration = time.monotonic() - start
+            self._schedule_smarthomes(smarthomes)
+            _LOGGER.debug("Next refresh in %s", self.update_interval)
+
+        # Entities only write their state when one of their fields changed
+        return changes
+
+    def _smarthome_ids(self) -> list[str]:
+        """Return the ids of the homes of the account."""
+        return [
+            smartHome["smarthome_id"] for smartHome in self.client.getSmartHomes() or []
+        ]
+
+    def _due_smarthomes(self, active: set[str]) -> set[str]:
+        """Return the homes whose slot came up, besides the active ones."""
+        due = set(self.schedule.due(dt_util.utcnow())) - active
+        if due or active:
+            return due
+        # Nothing is due when a refresh was requested, e.g. by update_entity
+        return set(self._smarthome_ids())
+
+    def _schedule_smarthomes(self, smarthomes: set[str] | None) -> None:
+        """Schedule the next slot of the refreshed homes and the next run."""
+        smarthome_ids = self._smarthome_ids()
+        if smarthomes is None:
+            self.schedule.set_homes(smarthome_ids)
+            smarthomes = smarthome_ids
+
+        now = dt_util.utcnow()
+        self.schedule.refreshed(
+            smarthomes, now, self.polling.refresh_interval(len(smarthome_ids))
+        )
+        self.update_interval = self._next_update_interval(now)
+
+    def _next_update_interval(self, now: datetime) -> timedelta:
+        """Return the interval until the active homes or the next slot are due."""
+        intervals = []
+        if active := self.polling.active_homes:
+            intervals.append(self.polling.next_interval(len(active)))
+        if (next_refresh := self.schedule.next_refresh()) is not None:
+            intervals.append(
+                max(next_refresh - now, timedelta(seconds=REFRESH_COALESCE_WINDOW))
+            )
+        return min(
+            intervals,
+            default=self.polling.refresh_interval(len(self._smarthome_ids())),
+        )
+
+    async def _async_refresh_last_communication(
+        self, smarthomes: set[str] | None
+    ) -> None:
+        """Fetch the last communication time of the refreshed homes."""
+        now = dt_util.utcnow()
+        if smarthomes is None:
+            # Every home is read, only fetch the ones not fetched this interval
+            smarthomes = throttled = set(self._smarthome_ids())
+        else:
+            # Active homes are read more often than their slot
+            throttled = smarthomes & self.polling.active_homes
+        # The others are on their slot, once per interval
+        smarthomes = {
+            smarthome
+            for smarthome in smarthomes
+            if smarthome not in throttled
+            or (last := self._last_communication_refresh.get(smarthome)) is None
+            or now - last >= self._last_communication_interval
+        }
+        if not smarthomes:
+            return
+        self._last_communication_refresh.update(dict.fromkeys(smarthomes, now))
+        await self.client.reloadLastCommunications(smarthomes)
+
+    async def async_load_last_communication(self) -> None:
+        """Fetch the last communication times once the entities exist."""
+        self._last_communication_refresh = dict.fromkeys(
+            self._smarthome_ids(), dt_util.utcnow()
+        )
+        await self.client.reloadLastCommunications()
+        # Only the central unit sensors depend on it
+        self.async_notify_changed({})
+
+    @callback
+    def async_notify_changed(self, changes: dict) -> None:
+        """Let the entities of locally changed devices write their state."""
+        self.data = changes
+        self.async_update_listeners()
+
+    def async_activity(self, smarthome: str) -> None:
+        """Poll the home quickly for a while to confirm a command."""
+        self.polling.activity({smarthome})
+        self.update_interval = self._next_update_interval(dt_util.utcnow())
+        self._schedule_refresh()
+
+    async def async_shutdown(self) -> None:
+        """Push queued commands before the coordinator stops."""
+        await self.commands.async_flush_all()
+        await super().async_shutdown()
+
+    def _reconcile_topology(self) -> None:
+        """Reload the entry when the live topology differs from the restored one."""
+        if self.topology is not None:
+            if self.client.getDeviceKeys() != self.topology.keys:
+                _LOGGER.info("Smarthome topology changed, reloading Watts Vision")
+                self.hass.config_entries.async_schedule_reload(
+                    self.config_entry.entry_id
+                )
+            return
+        self.topology = Topology.from_smarthomes(self.client.getSmartHomes())
+
+    def async_use_snapshot(self) -> None:
+        """Mark the restored snapshot as the topology the entities are built from."""
+        self.topology = Topology.from_smarthomes(self.client.getSmartHomes())
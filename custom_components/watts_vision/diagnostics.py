@@ -0,0 +1,98 @@
+"""Diagnostics support for Watts Vision."""
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceEntry
+
+from .const import API_CLIENT, COORDINATOR, DOMAIN
+
+TO_REDACT = {
+    CONF_PASSWORD,
+    CONF_USERNAME,
+    "address",
+    "city",
+    "email",
+    "label",
+    "latitude",
+    "longitude",
+    "mac_address",
+    "postal_code",
+}
+
+
+def _coordinator_diagnostics(coordinator) -> dict[str, Any]:
+    return {
+        "last_update_success": coordinator.last_update_success,
+        "last_exception": repr(coordinator.last_exception)
+        if coordinator.last_exception
+        else None,
+        "last_refresh_duration": round(coordinator.last_refresh_duration, 3)
+        if coordinator.last_refresh_duration is not None
+        else None,
+        "update_interval": str(coordinator.update_interval),
+        "refresh_phase": str(coordinator.refresh_phase),
+        "next_refreshes": {
+            smarthome_id: due.isoformat()
+            for smarthome_id, due in coordinator.schedule.next_refreshes().items()
+        },
+        "fast_polling": coordinator.polling.is_fast,
+        "fast_polling_homes": sorted(coordinator.polling.active_homes),
+        "max_data_age": str(coordinator.max_data_age)
+        if coordinator.max_data_age is not None
+        else None,
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    client = data[API_CLIENT]
+    coordinator = data[COORDINATOR]
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinator": _coordinator_diagnostics(coordinator),
+        "client": client.getDiagnostics(),
+        "topology": async_redact_data(client.getSmartHomes() or [], TO_REDACT),
+    }
+
+
+async def async_get_device_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry, device: DeviceEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a central unit or thermostat."""
+    client = hass.data[DOMAIN][entry.entry_id][API_CLIENT]
+    diagnostics = client.getDiagnostics()
+    identifiers = {
+        identifier for domain, identifier in device.identifiers if domain == DOMAIN
+    }
+
+    for smartHome in client.getSmartHomes() or []:
+        smarthome_id = smartHome["smarthome_id"]
+        if smarthome_id in identifiers:
+            return {
+                "smarthome": async_redact_data(smartHome, TO_REDACT),
+                "refresh_duration": diagnostics["refresh_durations"].get(smarthome_id),
+                "last_communication": diagnostics["last_communication"].get(
+                    smarthome_id
+                ),
+            }
+
+    for smarthome_id, deviceId in client.getDeviceKeys():
+        if deviceId in identifiers:
+            return {
+                "smarthome_id": smarthome_id,
+                "device": async_redact_data(
+                    client.getDevice(smarthome_id, deviceId), TO_REDACT
+                ),
+                "refresh_duration": diagnostics["refresh_durations"].get(smarthome_id),
+                "stale": diagnostics["stale"],
+            }
+
+    return {"identifiers": sorted(identifiers), "device": None}
@@ -0,0 +1,73 @@
+"""Base entity for the Watts Vision integration."""
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import WattsVisionCoordinator
+from .topology import Thermostat
+
+
+class WattsVisionEntity(CoordinatorEntity[WattsVisionCoordinator]):
+    """Entity of a Watts Vision device that is updated by the coordinator."""
+
+    # Device fields the state is derived from, None for all fields
+    _watched_fields: frozenset[str] | None = None
+    # Prepended to the device id to form the unique id of the entity
+    _unique_id_prefix: str
+
+    def __init__(self, coordinator: WattsVisionCoordinator, thermostat: Thermostat):
+        super().__init__(coordinator)
+        self.client = coordinator.client
+        self.smartHome = thermostat.smarthome_id
+        self.id = thermostat.id
+        self.zone = thermostat.zone
+        self._attr_unique_id = self._unique_id_prefix + thermostat.id
+        self._attr_device_info = thermostat.device_info
+        self._written_available = None
+
+    async def async_added_to_hass(self) -> None:
+        """Set the initial state from the data already loaded."""
+        await super().async_added_to_hass()
+        self._written_available = self.available
+        self._update_attrs()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Update the state once the coordinator finished a refresh."""
+        if not self._has_changed() and self.available == self._written_available:
+            return
+        self._written_available = self.available
+        self._update_attrs()
+        super()._handle_coordinator_update()
+
+    def _has_changed(self) -> bool:
+        """Return True when a watched field of the device changed."""
+        changes = self.coordinator.data
+        if changes is None:
+            return True
+        fields = changes.get((self.smartHome, self.id))
+        if not fields:
+            return False
+        return self._watched_fields is None or not fields.isdisjoint(
+            self._watched_fields
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return False while the device data could not be decoded."""
+        return (
+            super().available
+            and self.client.getDeviceState(self.smartHome, self.id) is not None
+        )
+
+    @property
+    def extra_state_attributes(self):
+        """Flag the state as stale while it comes from the restored snapshot."""
+        attributes = super().extra_state_attributes
+        if self.client.isStale():
+            return {**(attributes or {}), "stale": True}
+        return attributes
+
+    def _update_attrs(self) -> None:
+        """Update the entity state from the cached device data."""
+        raise NotImplementedError
@@ -0,0 +1,15 @@
+"""Exceptions raised by the Watts Vision API client."""
+
+from homeassistant.exceptions import HomeAssistantError
+
+
+class WattsApiError(HomeAssistantError):
+    """Base error for failures talking to the Watts cloud."""
+
+
+class WattsAuthenticationError(WattsApiError):
+    """The Watts cloud did not hand out an access token."""
+
+
+class WattsCircuitOpenError(WattsApiError):
+    """Requests are paused after repeated failures of the Watts cloud."""
@@ -0,0 +1,191 @@
+"""Per-endpoint request metrics and their Prometheus text exposition."""
+
+from bisect import bisect_left
+
+# Upper bounds in seconds of the request latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Metric families
+REQUESTS = "watts_vision_requests_total"
+ERRORS = "watts_vision_request_errors_total"
+DURATION = "watts_vision_request_duration_seconds"
+BYTES = "watts_vision_request_bytes_total"
+IN_FLIGHT = "watts_vision_requests_in_flight"
+QUEUED = "watts_vision_requests_queued"
+CIRCUIT_OPEN = "watts_vision_circuit_open"
+
+
+class EndpointMetrics:
+    """Counters and latency histogram of a single endpoint."""
+
+    def __init__(self):
+        self.requests = 0
+        # (status, code.key) -> count
+        self.errors: dict[tuple[str, str], int] = {}
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.latency_count = 0
+        self.latency_sum = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+
+class RequestMetrics:
+    """
+    Request metrics of a Watts cloud account, by endpoint.
+
+    Every attempt is counted, retries included, so the numbers reflect the
+    load the integration puts on the Watts cloud.
+    """
+
+    def __init__(self):
+        self._endpoints: dict[str, EndpointMetrics] = {}
+
+    def _endpoint(self, endpoint: str) -> EndpointMetrics:
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self._endpoints[endpoint] = EndpointMetrics()
+        return metrics
+
+    def record(
+        self,
+        endpoint: str,
+        latency: float,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+    ) -> None:
+        """Record a request that got a response."""
+        metrics = self._endpoint(endpoint)
+        metrics.requests += 1
+        # Buckets are cumulative when rendered, so only the first match counts
+        bucket = bisect_left(LATENCY_BUCKETS, latency)
+        if bucket < len(LATENCY_BUCKETS):
+            metrics.bucket_counts[bucket] += 1
+        metrics.latency_count += 1
+        metrics.latency_sum += latency
+        metrics.bytes_sent += bytes_sent
+        metrics.bytes_received += bytes_received
+
+    def record_error(self, endpoint: str, status: str, key: str = "") -> None:
+        """Count a failed request by status and Watts code.key."""
+        errors = self._endpoint(endpoint).errors
+        errors[(status, key)] = errors.get((status, key), 0) + 1
+
+    def stats(self) -> dict:
+        """Return the metrics of every endpoint."""
+        return {
+            endpoint: {
+                "requests": metrics.requests,
+                "errors": {
+                    f"{status} {key}".strip(): count
+                    for (status, key), count in metrics.errors.items()
+                },
+                "latency_mean": round(metrics.latency_sum / metrics.latency_count, 3)
+                if metrics.latency_count
+                else None,
+                "bytes_sent": metrics.bytes_sent,
+                "bytes_received": metrics.bytes_received,
+            }
+            for endpoint, metrics in self._endpoints.items()
+        }
+
+    def samples(self, labels: dict[str, str] | None = None) -> list[tuple[str, str]]:
+        """Return (metric family, sample line) pairs in Prometheus text format."""
+        samples = []
+        for endpoint, metrics in sorted(self._endpoints.items()):
+            base = {**(labels or {}), "endpoint": endpoint}
+            samples.append(sample(REQUESTS, base, metrics.requests))
+            for (status, key), count in sorted(metrics.errors.items()):
+                samples.append(
+                    sample(ERRORS, {**base, "status": status, "key": key}, count)
+                )
+
+            cumulative = 0
+            for bound, count in zip(
+                LATENCY_BUCKETS, metrics.bucket_counts, strict=True
+            ):
+                cumulative += count
+                samples.append(
+                    sample(DURATION, {**base, "le": str(bound)}, cumulative, "_bucket")
+                )
+            samples.append(
+                sample(
+                    DURATION, {**base, "le": "+Inf"}, metrics.latency_count, "_bucket"
+                )
+            )
+            samples.append(sample(DURATION, base, metrics.latency_sum, "_sum"))
+            samples.append(sample(DURATION, base, metrics.latency_count, "_count"))
+
+            samples.append(
+                sample(BYTES, {**base, "direction": "sent"}, metrics.bytes_sent)
+            )
+            samples.append(
+                sample(BYTES, {**base, "direction": "received"}, metrics.bytes_received)
+            )
+        return samples
+
+
+# Metadata of the metrics rendered by RequestMetrics and the metrics view
+METRIC_HELP = {
+    REQUESTS: (
+        "counter",
+        "Requests sent to the Watts cloud, retries included.",
+    ),
+    ERRORS: (
+        "counter",
+        "Failed requests by HTTP status or exception and Watts code.key.",
+    ),
+    DURATION: (
+        "histogram",
+        "Time from sending a request to reading its response.",
+    ),
+    BYTES: (
+        "counter",
+        "Bytes of request and response bodies.",
+    ),
+    IN_FLIGHT: (
+        "gauge",
+        "Requests currently sent to the Watts cloud.",
+    ),
+    QUEUED: (
+        "gauge",
+        "Requests waiting for a free slot.",
+    ),
+    CIRCUIT_OPEN: (
+        "gauge",
+        "1 while requests are paused by the circuit breaker.",
+    ),
+}
+
+
+def render_prometheus(samples: list[tuple[str, str]]) -> str:
+    """Return samples as a Prometheus text exposition with HELP and TYPE lines."""
+    families: dict[str, list[str]] = {}
+    for family, line in samples:
+        families.setdefault(family, []).append(line)
+
+    lines = []
+    for name, (kind, description) in METRIC_HELP.items():
+        if name not in families:
+            continue
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(families[name])
+    return "\n".join(lines) + "\n"
+
+
+def sample(
+    family: str, labels: dict[str, str], value: float, suffix: str = ""
+) -> tuple[str, str]:
+    """Return the (metric family, sample line) pair of a value."""
+    return family, f"{family}{suffix}{_labels(labels)} {value}"
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,39 @@
+"""Prometheus endpoint exposing the Watts cloud request metrics."""
+
+from aiohttp import web
+from homeassistant.components.http import KEY_HASS, HomeAssistantView
+
+from .const import API_CLIENT, DOMAIN, SCHEDULER
+from .metrics import CIRCUIT_OPEN, IN_FLIGHT, QUEUED, render_prometheus, sample
+
+
+class WattsVisionMetricsView(HomeAssistantView):
+    """Serve the request metrics in Prometheus text format."""
+
+    url = "/api/watts_vision/metrics"
+    name = "api:watts_vision:metrics"
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Render the metrics of the configured accounts."""
+        hass = request.app[KEY_HASS]
+        data = hass.data.get(DOMAIN, {})
+
+        samples = []
+        for entry in hass.config_entries.async_loaded_entries(DOMAIN):
+            if entry.entry_id not in data:
+                continue
+            client = data[entry.entry_id][API_CLIENT]
+            labels = {"entry": entry.entry_id}
+            samples.extend(client.getRequestMetrics().samples(labels))
+            samples.append(sample(CIRCUIT_OPEN, labels, int(not client.isAvailable())))
+
+        # The request slots are shared by all accounts
+        if (scheduler := data.get(SCHEDULER)) is not None:
+            samples.append(sample(IN_FLIGHT, {}, scheduler.in_flight))
+            samples.append(sample(QUEUED, {}, scheduler.queued))
+
+        return web.Response(
+            text=render_prometheus(samples),
+            content_type="text/plain",
+            charset="utf-8",
+        )
@@ -0,0 +1,77 @@
+"""Decoded device state of the Watts Vision cloud payload."""
+
+from dataclasses import dataclass
+
+from .const import _DEVICE_TO_MODE_TYPE, _TEMP_TYPE_TO_DEVICE, HeatMode, TempType
+
+
+def _tenths(value: str | float) -> float:
+    """Convert a value in tenths of a degree Fahrenheit to degrees."""
+    return float(value) / 10
+
+
+def _celsius(tenths: str | float) -> float:
+    """Convert a value in tenths of a degree Fahrenheit to degrees Celsius."""
+    return round((float(tenths) - 320) * 5 / 9 / 10, 1)
+
+
+@dataclass(frozen=True, slots=True)
+class WattsDevice:
+    """
+    State of a thermostat, decoded once when the cloud data is loaded.
+
+    Temperatures are in degrees Fahrenheit, like the Watts cloud reports them,
+    with a Celsius copy of the ones shown by the sensors.
+    """
+
+    id: str
+    id_device: str
+    gv_mode: str
+    # None for a gv_mode the integration does not know
+    heat_mode: HeatMode | None
+    temp_type: TempType | None
+    heating: bool
+    cooling: bool
+    battery_error: bool
+    temperature_air: float
+    temperature_air_celsius: float
+    # None while the thermostat is off or in an unknown mode
+    target_temperature: float | None
+    target_temperature_celsius: float | None
+    min_set_point: float
+    max_set_point: float
+    consigne_confort: float
+    consigne_eco: float
+    consigne_hg: float
+    consigne_boost: float
+
+    @classmethod
+    def from_payload(cls, device: dict) -> "WattsDevice":
+        """Decode a device of a smarthome/read response."""
+        gv_mode = device["gv_mode"]
+        mode = _DEVICE_TO_MODE_TYPE.get(gv_mode)
+        if mode is None or mode.heat_mode == HeatMode.OFF:
+            target = None
+        else:
+            target = device[_TEMP_TYPE_TO_DEVICE[mode.temp_type]]
+
+        return cls(
+            id=device["id"],
+            id_device=device["id_device"],
+            gv_mode=gv_mode,
+            heat_mode=mode.heat_mode if mode is not None else None,
+            temp_type=mode.temp_type if mode is not None else None,
+            heating=device["heating_up"] != "0",
+            cooling=device["heat_cool"] == "1",
+            battery_error=device["error_code"] == 1,
+            temperature_air=_tenths(device["temperature_air"]),
+            temperature_air_celsius=_celsius(device["temperature_air"]),
+            target_temperature=_tenths(target) if target is not None else None,
+            target_temperature_celsius=_celsius(target) if target is not None else None,
+            min_set_point=_tenths(device["min_set_point"]),
+            max_set_point=_tenths(device["max_set_point"]),
+            consigne_confort=_tenths(device["consigne_confort"]),
+            consigne_eco=_tenths(device["consigne_eco"]),
+            consigne_hg=_tenths(device["consigne_hg"]),
+            consigne_boost=_tenths(device["consigne_boost"]),
+        )
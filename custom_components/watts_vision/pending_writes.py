@@ -0,0 +1,75 @@
+"""Tracking of in-flight writes so refreshes don't clobber optimistic state."""
+
+import logging
+import time
+from datetime import timedelta
+
+from .const import _DEVICE_TO_MODE_TYPE
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _sameValue(name: str, expected: str, actual) -> bool:
+    """Compare device values, the cloud may format numbers differently."""
+    if name == "gv_mode" and expected in _DEVICE_TO_MODE_TYPE:
+        # A program reports the gv_mode of its current period, e.g. 8 for 11
+        mode = _DEVICE_TO_MODE_TYPE.get(actual)
+        return (
+            mode is not None
+            and mode.heat_mode == _DEVICE_TO_MODE_TYPE[expected].heat_mode
+        )
+    try:
+        return float(expected) == float(actual)
+    except (TypeError, ValueError):
+        return str(expected) == str(actual)
+
+
+class PendingWrites:
+    """
+    In-flight device writes with a deadline.
+
+    Until the cloud reports the written values, or the deadline passes, the
+    written values are overlaid on every freshly fetched device.
+    """
+
+    def __init__(self, timeout: timedelta):
+        self._timeout = timeout
+        # Written fields and monotonic deadline per device
+        self._writes: dict[tuple[str, str], tuple[dict, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._writes)
+
+    def add(self, smarthome: str, deviceId: str, fields: dict) -> None:
+        """Record written fields, merged with earlier writes to the device."""
+        key = (smarthome, deviceId)
+        pending, _deadline = self._writes.get(key, ({}, None))
+        self._writes[key] = (
+            {**pending, **fields},
+            time.monotonic() + self._timeout.total_seconds(),
+        )
+
+    def discard(self, smarthome: str, deviceId: str) -> None:
+        """Forget the writes to a device, e.g. when the push failed."""
+        self._writes.pop((smarthome, deviceId), None)
+
+    def apply(self, key: tuple[str, str], device: dict | None) -> None:
+        """Overlay the pending writes of a device on its fetched state."""
+        if key not in self._writes:
+            return
+
+        fields, deadline = self._writes[key]
+        if device is None or deadline <= time.monotonic():
+            _LOGGER.debug(f"Pending write for {key} expired unconfirmed")
+            del self._writes[key]
+        elif all(
+            _sameValue(name, value, device.get(name)) for name, value in fields.items()
+        ):
+            _LOGGER.debug(f"Pending write for {key} confirmed")
+            del self._writes[key]
+        else:
+            device.update(fields)
+
+    def keys(self) -> list[tuple[str, str]]:
+        """Return the devices with pending writes."""
+        return list(self._writes)
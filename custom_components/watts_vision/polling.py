@@ -0,0 +1,150 @@
+"""Adaptive polling interval for the Watts Vision coordinator."""
+
+import logging
+import math
+import random
+import time
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DEFAULT_REFRESH_JITTER,
+    DEFAULT_REQUEST_BUDGET,
+    FAST_POLL_INTERVAL,
+    FAST_POLL_WINDOW,
+    REFRESH_COALESCE_WINDOW,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AdaptivePollingScheduler:
+    """
+    Chooses the interval until the next refresh of the active smart homes.
+
+    After a command or a detected change the home is polled every
+    FAST_POLL_INTERVAL for FAST_POLL_WINDOW, then the interval doubles on
+    every quiet refresh until the configured interval is reached and the
+    home goes back to its own slot. The interval never drops below what the
+    hourly request budget of the account allows.
+    """
+
+    def __init__(
+        self,
+        interval: timedelta,
+        fast_interval: timedelta = timedelta(seconds=FAST_POLL_INTERVAL),
+        fast_window: timedelta = timedelta(seconds=FAST_POLL_WINDOW),
+        request_budget: int = DEFAULT_REQUEST_BUDGET,
+    ):
+        self._interval = interval
+        self._fast_interval = min(fast_interval, interval)
+        self._fast_window = fast_window
+        self._request_budget = request_budget
+        # Monotonic end of the fast window of every active home
+        self._fast_until: dict[str, float] = {}
+        self._current = interval
+
+    @property
+    def is_fast(self) -> bool:
+        """Return True while polling quickly to confirm a change."""
+        now = time.monotonic()
+        return any(now < until for until in self._fast_until.values())
+
+    @property
+    def active_homes(self) -> set[str]:
+        """Return the homes polled at the adaptive interval instead of their slot."""
+        return set(self._fast_until)
+
+    def activity(self, smarthome_ids: Iterable[str]) -> None:
+        """Poll the homes quickly for a while, e.g. after a command or a change."""
+        fast_until = time.monotonic() + self._fast_window.total_seconds()
+        self._fast_until.update(dict.fromkeys(smarthome_ids, fast_until))
+        self._current = self._fast_interval
+
+    def next_interval(self, requests_per_refresh: int) -> timedelta:
+        """Return the interval until the next refresh of the active homes."""
+        if self.is_fast:
+            self._current = self._fast_interval
+        else:
+            self._current = min(self._current * 2, self._interval)
+            if self._current >= self._interval:
+                # Back to the configured pace, the homes return to their slot
+                self._fast_until.clear()
+        return max(self._current, self._budget_interval(requests_per_refresh))
+
+    def refresh_interval(self, requests_per_refresh: int) -> timedelta:
+        """Return the interval between two refreshes of a home on its slot."""
+        return max(self._interval, self._budget_interval(requests_per_refresh))
+
+    def _budget_interval(self, requests_per_refresh: int) -> timedelta:
+        """Spread the hourly budget over the refreshes."""
+        return timedelta(hours=max(requests_per_refresh, 1) / self._request_budget)
+
+
+class PhasedRefreshSchedule:
+    """
+    Spreads the refreshes of the smart homes of an account over the interval.
+
+    Every home gets its own phase, evenly spaced within the interval and
+    shifted by the phase of the account, and is refreshed on its own slot
+    instead of together with the other homes. The optional jitter delays
+    each slot by a random part of the spacing between two homes, so the
+    homes keep their order.
+    """
+
+    def __init__(self, phase: float = 0.0, jitter: float = DEFAULT_REFRESH_JITTER):
+        self._phase = phase
+        self._jitter = jitter
+        self._start = dt_util.utcnow()
+        self._window = timedelta(seconds=REFRESH_COALESCE_WINDOW)
+        # Phase of every home as a fraction of the interval
+        self._offsets: dict[str, float] = {}
+        self._next: dict[str, datetime] = {}
+
+    def set_homes(self, smarthome_ids: list[str]) -> None:
+        """Assign evenly spaced phases to the homes of the account."""
+        count = len(smarthome_ids)
+        self._offsets = {
+            smarthome_id: (self._phase + position / count) % 1
+            for position, smarthome_id in enumerate(smarthome_ids)
+        }
+        self._next = {
+            smarthome_id: due
+            for smarthome_id, due in self._next.items()
+            if smarthome_id in self._offsets
+        }
+
+    def due(self, now: datetime) -> list[str]:
+        """Return the homes to refresh now, with the ones due within the window."""
+        horizon = now + self._window
+        return [
+            smarthome_id
+            for smarthome_id in self._offsets
+            if self._next.get(smarthome_id, now) <= horizon
+        ]
+
+    def refreshed(
+        self, smarthome_ids: Iterable[str], now: datetime, interval: timedelta
+    ) -> None:
+        """Schedule the next slot of the refreshed homes."""
+        period = interval.total_seconds()
+        elapsed = (now - self._start).total_seconds()
+        # Homes refreshed ahead of their slot skip the slot they were pulled from
+        reference = elapsed + self._window.total_seconds()
+        spacing = period / max(len(self._offsets), 1)
+        for smarthome_id in smarthome_ids:
+            offset = self._offsets.get(smarthome_id, 0) * period
+            slot = offset + (math.floor((reference - offset) / period) + 1) * period
+            if self._jitter:
+                slot += random.uniform(0, self._jitter * spacing)
+            self._next[smarthome_id] = now + timedelta(seconds=slot - elapsed)
+
+    def next_refresh(self) -> datetime | None:
+        """Return when the next home is due, None before the first refresh."""
+        return min(self._next.values(), default=None)
+
+    def next_refreshes(self) -> dict[str, datetime]:
+        """Return when every home is due next."""
+        return dict(self._next)
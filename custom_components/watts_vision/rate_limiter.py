@@ -0,0 +1,105 @@
+"""Token bucket rate limiter for requests to the Watts cloud."""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Account-wide token bucket.
+
+    Every request takes one token. The bucket holds at most capacity tokens
+    and refills at rate tokens per second; callers wait for a token when
+    the bucket is empty. Waiting callers get tokens by priority and, within
+    a priority, in arrival order.
+    """
+
+    def __init__(self, capacity: int, rate: float):
+        self._capacity = capacity
+        self._rate = rate
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        # Hands out tokens to the waiters once the bucket refilled
+        self._timer: asyncio.TimerHandle | None = None
+        self.acquired = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    async def acquire(self, priority: int = 0) -> None:
+        """Take a token, waiting until one is available."""
+        start = time.monotonic()
+        self._refill()
+        if self._tokens >= 1 and not self._waiters:
+            self._tokens -= 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+            self._schedule()
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # The token was handed over just before the cancellation
+                    self._tokens += 1
+                    self._dispatch()
+                raise
+
+        waited = time.monotonic() - start
+        self.acquired += 1
+        if waited >= 0.001:
+            self.waits += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            _LOGGER.debug(f"Rate limited request waited {waited:.2f}s")
+
+    def _schedule(self) -> None:
+        """Wake up when the next token is available for the waiters."""
+        if self._timer is not None or not self._waiters:
+            return
+        delay = max(0.0, (1 - self._tokens) / self._rate)
+        self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand out the available tokens to the most urgent waiters."""
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self._tokens -= 1
+                future.set_result(None)
+        while self._waiters and self._waiters[0][2].done():
+            # Drop cancelled waiters so they don't keep the timer running
+            heapq.heappop(self._waiters)
+        self._schedule()
+
+    def stats(self) -> dict:
+        """Return the wait time metrics."""
+        self._refill()
+        return {
+            "capacity": self._capacity,
+            "rate": self._rate,
+            "tokens": round(self._tokens, 2),
+            "acquired": self.acquired,
+            "waits": self.waits,
+            "total_wait": round(self.total_wait, 3),
+            "max_wait": round(self.max_wait, 3),
+        }
@@ -0,0 +1,74 @@
+"""Retry and circuit breaker helpers for requests to the Watts cloud."""
+
+import logging
+import random
+import time
+from datetime import timedelta
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Return a jittered exponential backoff delay in seconds for a retry."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests after repeated failures.
+
+    After failure_threshold consecutive failures the breaker opens and
+    requests are refused until the cool-down passes. Then a single probe
+    request is let through; it closes the breaker on success and reopens
+    it on failure.
+    """
+
+    def __init__(self, failure_threshold: int, cooldown: timedelta):
+        self._failure_threshold = failure_threshold
+        self._cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while requests are refused."""
+        return (
+            self._opened_at is not None
+            and time.monotonic() < self._opened_at + self._cooldown.total_seconds()
+        )
+
+    def allow_request(self) -> bool:
+        """Return True when a request may be sent."""
+        if self._opened_at is None:
+            return True
+        if self.is_open or self._probing:
+            return False
+        _LOGGER.debug("Circuit breaker cool-down passed, probing the Watts cloud")
+        self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful request."""
+        if self._opened_at is not None:
+            _LOGGER.info("Watts cloud reachable again, closing circuit breaker")
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def release_probe(self) -> None:
+        """Let another probe through after one ended without an outcome."""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a failed request, opening the breaker at the threshold."""
+        self._failures += 1
+        self._probing = False
+        if self._opened_at is not None or self._failures >= self._failure_threshold:
+            if self._opened_at is None:
+                _LOGGER.warning(
+                    "Watts cloud failed %s times in a row, pausing requests for %s",
+                    self._failures,
+                    self._cooldown,
+                )
+            self._opened_at = time.monotonic()
@@ -2,7 +2,6 @@
 
 import logging
 from collections.abc import Callable
-from datetime import timedelta
 
 from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
 from homeassistant.config_entries import ConfigEntry
@@ -11,106 +10,52 @@ from homeassistant.core import HomeAssistant
 
 from .central_unit import WattsVisionLastCommunicationSensor
 from .const import (
-    API_CLIENT,
+    COORDINATOR,
     DOMAIN,
     _AVAILABLE_HEAT_MODES,
     _AVAILABLE_TEMP_TYPES,
-    _DEVICE_TO_MODE_TYPE,
     _TEMP_TYPE_TO_DEVICE,
 )
-from .watts_api import WattsApi
+from .coordinator import WattsVisionCoordinator
+from .entity import WattsVisionEntity
+from .topology import Thermostat
 
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = timedelta(seconds=120)
-
 
 async def async_setup_entry(
     hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities: Callable
 ):
     """Set up the sensor platform."""
-    wattsClient: WattsApi = hass.data[DOMAIN][API_CLIENT]
-
-    smartHomes = wattsClient.getSmartHomes()
+    coordinator: WattsVisionCoordinator = hass.data[DOMAIN][config_entry.entry_id][
+        COORDINATOR
+    ]
 
     sensors = []
+    for home in coordinator.topology.homes:
+        for thermostat in home.thermostats:
+            sensors.append(WattsVisionPresetModeSensor(coordinator, thermostat))
+            sensors.append(WattsVisionTemperatureModeSensor(coordinator, thermostat))
+            sensors.append(WattsVisionTemperatureSensor(coordinator, thermostat))
+            sensors.append(WattsVisionSetTemperatureSensor(coordinator, thermostat))
+            sensors.append(WattsVisionBatterySensor(coordinator, thermostat))
+        sensors.append(WattsVisionLastCommunicationSensor(coordinator, home))
 
-    if smartHomes is not None:
-        for y in range(len(smartHomes)):
-            if smartHomes[y]["zones"] is not None:
-                for z in range(len(smartHomes[y]["zones"])):
-                    if smartHomes[y]["zones"][z]["devices"] is not None:
-                        for x in range(len(smartHomes[y]["zones"][z]["devices"])):
-                            sensors.append(
-                                WattsVisionPresetModeSensor(
-                                    wattsClient,
-                                    smartHomes[y]["smarthome_id"],
-                                    smartHomes[y]["zones"][z]["devices"][x]["id"],
-                                    smartHomes[y]["zones"][z]["zone_label"],
-                                )
-                            )
-                            sensors.append(
-                                WattsVisionTemperatureModeSensor(
-                                    wattsClient,
-                                    smartHomes[y]["smarthome_id"],
-                                    smartHomes[y]["zones"][z]["devices"][x]["id"],
-                                    smartHomes[y]["zones"][z]["zone_label"],
-                                )
-                            )
-                            sensors.append(
-                                WattsVisionTemperatureSensor(
-                                    wattsClient,
-                                    smartHomes[y]["smarthome_id"],
-                                    smartHomes[y]["zones"][z]["devices"][x]["id"],
-                                    smartHomes[y]["zones"][z]["zone_label"],
-                                )
-                            )
-                            sensors.append(
-                                WattsVisionSetTemperatureSensor(
-                                    wattsClient,
-                                    smartHomes[y]["smarthome_id"],
-                                    smartHomes[y]["zones"][z]["devices"][x]["id"],
-                                    smartHomes[y]["zones"][z]["zone_label"],
-                                )
-                            )
-                            sensors.append(
-                                WattsVisionBatterySensor(
-                                    wattsClient,
-                                    smartHomes[y]["smarthome_id"],
-                                    smartHomes[y]["zones"][z]["devices"][x]["id"],
-                                    smartHomes[y]["zones"][z]["zone_label"],
-                                )
-                            )
-            sensors.append(
-                WattsVisionLastCommunicationSensor(
-                    wattsClient,
-                    smartHomes[y]["smarthome_id"],
-                    smartHomes[y]["label"],
-                    smartHomes[y]["mac_address"],
-                )
-            )
+    async_add_entities(sensors)
 
-    async_add_entities(sensors, update_before_add=True)
 
-
-class WattsVisionPresetModeSensor(SensorEntity):
+class WattsVisionPresetModeSensor(WattsVisionEntity, SensorEntity):
     """Representation of a Watts Vision thermostat."""
 
-    def __init__(self, wattsClient: WattsApi, smartHome: str, id: str, zone: str):
-        super().__init__()
-        self.client = wattsClient
-        self.smartHome = smartHome
-        self.id = id
-        self.zone = zone
-        self._name = zone + " Preset mode"
+    _watched_fields = frozenset(["gv_mode"])
+    _unique_id_prefix = "thermostat_mode_"
+
+    def __init__(self, coordinator: WattsVisionCoordinator, thermostat: Thermostat):
+        super().__init__(coordinator, thermostat)
+        self._name = self.zone + " Preset mode"
         self._state = None
         self._available = True
 
-    @property
-    def unique_id(self) -> str:
-        """Return the unique ID of the sensor."""
-        return "thermostat_mode_" + self.id
-
     @property
     def name(self) -> str:
         """Return the name of the entity."""
@@ -128,48 +73,28 @@ class WattsVisionPresetModeSensor(SensorEntity):
     def options(self):
         return [mode.value.capitalize() for mode in _AVAILABLE_HEAT_MODES]
 
-    @property
-    def device_info(self):
-        return {
-            "identifiers": {
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, self.id)
-            },
-            "manufacturer": "Watts",
-            "name": "Thermostat " + self.zone,
-            "model": "BT-D03-RF",
-            "via_device": (DOMAIN, self.smartHome),
-            "suggested_area": self.zone,
-        }
-
-    async def async_update(self):
-        # try:
-        smartHomeDevice = self.client.getDevice(self.smartHome, self.id)
-
-        self._state = _DEVICE_TO_MODE_TYPE[smartHomeDevice["gv_mode"]].heat_mode.value.capitalize()
-
-        # except:
-        #     self._available = False
-        #     _LOGGER.exception("Error retrieving data.")
-
-class WattsVisionTemperatureModeSensor(SensorEntity):
+    def _update_attrs(self):
+        device = self.client.getDeviceState(self.smartHome, self.id)
+        if device is None:
+            return
+
+        if device.heat_mode is None:
+            self._state = None
+        else:
+            self._state = device.heat_mode.value.capitalize()
+
+class WattsVisionTemperatureModeSensor(WattsVisionEntity, SensorEntity):
     """Representation of a Watts Vision thermostat."""
 
-    def __init__(self, wattsClient: WattsApi, smartHome: str, id: str, zone: str):
-        super().__init__()
-        self.client = wattsClient
-        self.smartHome = smartHome
-        self.id = id
-        self.zone = zone
-        self._name = zone + " Temperature mode"
+    _watched_fields = frozenset(["gv_mode"])
+    _unique_id_prefix = "temperature_mode_"
+
+    def __init__(self, coordinator: WattsVisionCoordinator, thermostat: Thermostat):
+        super().__init__(coordinator, thermostat)
+        self._name = self.zone + " Temperature mode"
         self._state = None
         self._available = True
 
-    @property
-    def unique_id(self) -> str:
-        """Return the unique ID of the sensor."""
-        return "temperature_mode_" + self.id
-
     @property
     def name(self) -> str:
         """Return the name of the entity."""
@@ -187,48 +112,28 @@ class WattsVisionTemperatureModeSensor(SensorEntity):
     def options(self):
         return [mode.value.capitalize() for mode in _AVAILABLE_TEMP_TYPES]
 
-    @property
-    def device_info(self):
-        return {
-            "identifiers": {
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, self.id)
-            },
-            "manufacturer": "Watts",
-            "name": "Thermostat " + self.zone,
-            "model": "BT-D03-RF",
-            "via_device": (DOMAIN, self.smartHome),
-            "suggested_area": self.zone,
-        }
-
-    async def async_update(self):
-        # try:
-        smartHomeDevice = self.client.getDevice(self.smartHome, self.id)
-
-        self._state = _DEVICE_TO_MODE_TYPE[smartHomeDevice["gv_mode"]].temp_type.value.capitalize()
-
-        # except:
-        #     self._available = False
-        #     _LOGGER.exception("Error retrieving data.")
-
-class WattsVisionBatterySensor(SensorEntity):
+    def _update_attrs(self):
+        device = self.client.getDeviceState(self.smartHome, self.id)
+        if device is None:
+            return
+
+        if device.temp_type is None:
+            self._state = None
+        else:
+            self._state = device.temp_type.value.capitalize()
+
+class WattsVisionBatterySensor(WattsVisionEntity, SensorEntity):
     """Representation of the state of a Watts Vision device."""
 
-    def __init__(self, wattsClient: WattsApi, smartHome: str, id: str, zone: str):
-        super().__init__()
-        self.client = wattsClient
-        self.smartHome = smartHome
-        self.id = id
-        self.zone = zone
-        self._name = zone + " Battery"
+    _watched_fields = frozenset(["error_code"])
+    _unique_id_prefix = "battery_"
+
+    def __init__(self, coordinator: WattsVisionCoordinator, thermostat: Thermostat):
+        super().__init__(coordinator, thermostat)
+        self._name = self.zone + " Battery"
         self._state = None
         self._available = None
 
-    @property
-    def unique_id(self) -> str:
-        """Return the unique ID of the sensor."""
-        return "battery_" + self.id
-
     @property
     def name(self) -> str:
         """Return the name of the entity."""
@@ -243,46 +148,35 @@ class WattsVisionBatterySensor(SensorEntity):
         return PERCENTAGE
 
     @property
-    def state(self) -> int:
-        if self.client.getDevice(self.smartHome, self.id)["error_code"] == 1:
+    def state(self) -> int | None:
+        return self._state
+
+    def _update_attrs(self):
+        device = self.client.getDeviceState(self.smartHome, self.id)
+        if device is None:
+            return
+
+        if device.battery_error:
             _LOGGER.warning(
                 "Battery is malfunctioning or (almost) empty for device %s ", self.id
             )
-            return 0
-        return 100
+            self._state = 0
+        else:
+            self._state = 100
 
-    @property
-    def device_info(self):
-        return {
-            "identifiers": {
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, self.id)
-            },
-            "manufacturer": "Watts",
-            "name": "Thermostat " + self.zone,
-            "model": "BT-D03-RF",
-            "via_device": (DOMAIN, self.smartHome),
-        }
-
-
-class WattsVisionTemperatureSensor(SensorEntity):
+
+class WattsVisionTemperatureSensor(WattsVisionEntity, SensorEntity):
     """Representation of a Watts Vision temperature sensor."""
 
-    def __init__(self, wattsClient: WattsApi, smartHome: str, id: str, zone: str):
-        super().__init__()
-        self.client = wattsClient
-        self.smartHome = smartHome
-        self.id = id
-        self.zone = zone
-        self._name = zone + " Air temperature"
+    _watched_fields = frozenset(["temperature_air"])
+    _unique_id_prefix = "temperature_air_"
+
+    def __init__(self, coordinator: WattsVisionCoordinator, thermostat: Thermostat):
+        super().__init__(coordinator, thermostat)
+        self._name = self.zone + " Air temperature"
         self._state = None
         self._available = True
 
-    @property
-    def unique_id(self) -> str:
-        """Return the unique ID of the sensor."""
-        return "temperature_air_" + self.id
-
     @property
     def name(self) -> str:
         """Return the name of the entity."""
@@ -300,50 +194,31 @@ class WattsVisionTemperatureSensor(SensorEntity):
     def native_unit_of_measurement(self):
         return UnitOfTemperature.FAHRENHEIT
 
-    @property
-    def device_info(self):
-        return {
-            "identifiers": {
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, self.id)
-            },
-            "manufacturer": "Watts",
-            "name": "Thermostat " + self.zone,
-            "model": "BT-D03-RF",
-            "via_device": (DOMAIN, self.smartHome),
-        }
-
-    async def async_update(self):
-        # try:
-        smartHomeDevice = self.client.getDevice(self.smartHome, self.id)
-        value = int(smartHomeDevice["temperature_air"])
+    def _update_attrs(self):
+        device = self.client.getDeviceState(self.smartHome, self.id)
+        if device is None:
+            return
+
         if self.hass.config.units.temperature_unit == UnitOfTemperature.CELSIUS:
-            self._state = round((value - 320) * 5 / 9 / 10, 1)
+            self._state = device.temperature_air_celsius
         else:
-            self._state = value / 10
-        # except:
-        #     self._available = False
-        #     _LOGGER.exception("Error retrieving data.")
+            self._state = device.temperature_air
 
 
-class WattsVisionSetTemperatureSensor(SensorEntity):
+class WattsVisionSetTemperatureSensor(WattsVisionEntity, SensorEntity):
     """Representation of a Watts Vision temperature sensor."""
 
-    def __init__(self, wattsClient: WattsApi, smartHome: str, id: str, zone: str):
-        super().__init__()
-        self.client = wattsClient
-        self.smartHome = smartHome
-        self.id = id
-        self.zone = zone
-        self._name = zone + " Target temperature"
+    _watched_fields = frozenset(
+        ["gv_mode"] + [_TEMP_TYPE_TO_DEVICE[mode] for mode in _AVAILABLE_TEMP_TYPES]
+    )
+    _unique_id_prefix = "target_temperature_"
+
+    def __init__(self, coordinator: WattsVisionCoordinator, thermostat: Thermostat):
+        super().__init__(coordinator, thermostat)
+        self._name = self.zone + " Target temperature"
         self._state = None
         self._available = True
 
-    @property
-    def unique_id(self) -> str:
-        """Return the unique ID of the sensor."""
-        return "target_temperature_" + self.id
-
     @property
     def name(self) -> str:
         """Return the name of the entity."""
@@ -361,32 +236,13 @@ class WattsVisionSetTemperatureSensor(SensorEntity):
     def native_unit_of_measurement(self):
         return UnitOfTemperature.FAHRENHEIT
 
-    @property
-    def device_info(self):
-        return {
-            "identifiers": {
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, self.id)
-            },
-            "manufacturer": "Watts",
-            "name": "Thermostat " + self.zone,
-            "model": "BT-D03-RF",
-            "via_device": (DOMAIN, self.smartHome),
-        }
-
-    async def async_update(self):
-        # try:
-        smartHomeDevice = self.client.getDevice(self.smartHome, self.id)
-
-        if smartHomeDevice["gv_mode"] == "1":
-            self._state = NaN
+    def _update_attrs(self):
+        device = self.client.getDeviceState(self.smartHome, self.id)
+        if device is None:
+            return
+
+        # No target while the thermostat is off
+        if self.hass.config.units.temperature_unit == UnitOfTemperature.CELSIUS:
+            self._state = device.target_temperature_celsius
         else:
-            value = int(smartHomeDevice[_TEMP_TYPE_TO_DEVICE[_DEVICE_TO_MODE_TYPE[smartHomeDevice["gv_mode"]].temp_type]])
-            if self.hass.config.units.temperature_unit == UnitOfTemperature.CELSIUS:
-                self._state = round((value - 320) * 5 / 9 / 10, 1)
-            else:
-                self._state = value / 10
-
-        # except:
-        #     self._available = False
-        #     _LOGGER.exception("Error retrieving data.")
+            self._state = device.target_temperature
@@ -0,0 +1,99 @@
+"""Immutable registry of the smart homes, zones and thermostats of an account."""
+
+from dataclasses import dataclass
+
+from homeassistant.helpers.device_registry import CONNECTION_NETWORK_MAC, DeviceInfo
+
+from .const import DOMAIN
+
+
+@dataclass(frozen=True, slots=True)
+class Thermostat:
+    """A thermostat and the device info shared by all of its entities."""
+
+    smarthome_id: str
+    id: str
+    id_device: str
+    zone: str
+    device_info: DeviceInfo
+
+    @property
+    def key(self) -> tuple[str, str]:
+        """Return the (smarthome_id, id) key of the device in WattsApi."""
+        return (self.smarthome_id, self.id)
+
+
+@dataclass(frozen=True, slots=True)
+class Home:
+    """A smart home with the device info of its central unit."""
+
+    smarthome_id: str
+    label: str
+    mac_address: str
+    device_info: DeviceInfo
+    thermostats: tuple[Thermostat, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Topology:
+    """
+    Flattened view of the loaded smart homes, built once per load.
+
+    Platforms create their entities from it, so the nested cloud payload is
+    walked and the device info of every device is built a single time.
+    """
+
+    homes: tuple[Home, ...]
+    thermostats: tuple[Thermostat, ...]
+    keys: frozenset[tuple[str, str]]
+
+    @classmethod
+    def from_smarthomes(cls, smartHomes: list | None) -> "Topology":
+        """Build the topology from the smart homes loaded by WattsApi."""
+        homes = []
+        for smartHome in smartHomes or []:
+            smarthome_id = smartHome["smarthome_id"]
+            thermostats = tuple(
+                Thermostat(
+                    smarthome_id=smarthome_id,
+                    id=device["id"],
+                    id_device=device["id_device"],
+                    zone=zone["zone_label"],
+                    device_info=DeviceInfo(
+                        identifiers={(DOMAIN, device["id"])},
+                        manufacturer="Watts",
+                        name="Thermostat " + zone["zone_label"],
+                        model="BT-D03-RF",
+                        via_device=(DOMAIN, smarthome_id),
+                        suggested_area=zone["zone_label"],
+                    ),
+                )
+                for zone in smartHome.get("zones") or []
+                for device in zone.get("devices") or []
+            )
+            homes.append(
+                Home(
+                    smarthome_id=smarthome_id,
+                    label=smartHome["label"],
+                    mac_address=smartHome["mac_address"],
+                    device_info=DeviceInfo(
+                        identifiers={(DOMAIN, smarthome_id)},
+                        manufacturer="Watts",
+                        name="Central Unit " + smartHome["label"],
+                        model="BT-CT02-RF",
+                        connections={
+                            (CONNECTION_NETWORK_MAC, smartHome["mac_address"])
+                        },
+                    ),
+                    thermostats=thermostats,
+                )
+            )
+
+        thermostats = tuple(
+            thermostat for home in homes for thermostat in home.thermostats
+        )
+        return cls(
+            homes=tuple(homes),
+            thermostats=thermostats,
+            keys=frozenset(thermostat.key for thermostat in thermostats),
+        )
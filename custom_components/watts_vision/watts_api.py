@@ -1,39 +1,198 @@
+import asyncio
 import logging
 import time
+from collections import deque
+from collections.abc import Collection
 from datetime import datetime, timedelta
+from urllib.parse import urlencode
 
-import requests
+from aiohttp import ClientConnectionError, ClientError, ClientTimeout
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+from homeassistant.util.json import json_loads
+
+from .const import (
+    _DEVICE_TO_MODE_TYPE,
+    _PUSHED_SETPOINTS,
+    CIRCUIT_BREAKER_COOLDOWN,
+    CIRCUIT_BREAKER_THRESHOLD,
+    DEFAULT_MAX_IN_FLIGHT_REQUESTS,
+    DEFAULT_RATE_LIMIT_CAPACITY,
+    DEFAULT_RATE_LIMIT_RATE,
+    LAST_COMMUNICATION_MARGIN,
+    PENDING_WRITE_TIMEOUT,
+    RECENT_ERRORS,
+    REQUEST_TIMEOUT,
+    RETRY_ATTEMPTS,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+    SNAPSHOT_SAVE_DELAY,
+    SNAPSHOT_STORAGE_KEY,
+    STORAGE_VERSION,
+    TOKEN_REFRESH_MARGIN,
+    TOKEN_STORAGE_KEY,
+    HeatMode,
+)
+from .exceptions import (
+    WattsApiError,
+    WattsAuthenticationError,
+    WattsCircuitOpenError,
+)
+from .metrics import RequestMetrics
+from .models import WattsDevice
+from .pending_writes import PendingWrites
+from .rate_limiter import TokenBucket
+from .request_scheduler import Priority, RequestScheduler
+from .resilience import CircuitBreaker, backoff_delay
 
 _LOGGER = logging.getLogger(__name__)
 
+TOKEN_URL = "https://auth.smarthome.wattselectronics.com/realms/watts/protocol/openid-connect/token"
+API_URL = "https://smarthome.wattselectronics.com/api/v0.1/human/"
+
+
+def _pushedSetpoints(value: str, gvMode: str) -> dict:
+    """Get the setpoint fields a push in gvMode writes"""
+    return {
+        name: value if fixed is None else fixed
+        for name, fixed in _PUSHED_SETPOINTS.get(gvMode, {}).items()
+    }
+
 
 class WattsApi:
     """Interface to the Watts API."""
 
-    def __init__(self, hass: HomeAssistant, username: str, password: str):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        username: str,
+        password: str,
+        rate_limit_capacity: int = DEFAULT_RATE_LIMIT_CAPACITY,
+        rate_limit_rate: float = DEFAULT_RATE_LIMIT_RATE,
+        scheduler: RequestScheduler | None = None,
+        token_url: str | None = None,
+        api_url: str | None = None,
+    ):
         """Init dummy hub."""
         self._hass = hass
+        # Shared keep-alive connection pool managed by Home Assistant
+        self._session = async_get_clientsession(hass)
         self._username = username
+        # Overridable to talk to a local stand-in of the Watts cloud
+        self._token_url = token_url or TOKEN_URL
+        self._api_url = api_url or API_URL
         self._password = password
         self._token = None
         self._token_expires = None
         self._refresh_token = None
-        self._refreshing_token = False
+        self._token_lock = asyncio.Lock()
+        self._cancel_token_refresh = None
+        # Tokens are persisted so a restart does not need a password login
+        self._token_store = Store(
+            hass,
+            STORAGE_VERSION,
+            TOKEN_STORAGE_KEY.format(slugify(username)),
+            private=True,
+        )
         self._refresh_expires_in = None
         self._smartHomeData = {}
+        # Set while the device data comes from the snapshot of a previous run
+        self._stale = False
+        # The snapshot holds the address and location of the smart homes
+        self._snapshot_store = Store(
+            hass,
+            STORAGE_VERSION,
+            SNAPSHOT_STORAGE_KEY.format(slugify(username)),
+            private=True,
+        )
+        # Device lookup indexes, rebuilt after every (re)load of the devices
+        self._deviceIndex = {}
+        self._deviceIdIndex = {}
+        # Decoded state of every device, updated when its payload changes
+        self._deviceStates: dict[tuple[str, str], WattsDevice] = {}
+        # Last time each central unit talked to the cloud
+        self._lastCommunication = {}
+        # Seconds the last device load of each smart home took
+        self._refreshDurations = {}
+        # When the devices of each smart home were last read from the cloud
+        self._devicesLoaded: dict[str, datetime] = {}
+        # Device reads skipped because the central unit had no new data
+        self._skippedReads = 0
+        # Failed responses, newest last
+        self._recentErrors = deque(maxlen=RECENT_ERRORS)
+        # Changed fields per device during the last reload, None means all
+        self._changes = None
+        # Written values that the cloud has not confirmed yet
+        self._pendingWrites = PendingWrites(timedelta(seconds=PENDING_WRITE_TIMEOUT))
+        # Bounds the requests in flight, sending user commands before background polls
+        self._scheduler = scheduler or RequestScheduler(DEFAULT_MAX_IN_FLIGHT_REQUESTS)
+        # Limits the request rate of the whole account
+        self._rateLimiter = TokenBucket(rate_limit_capacity, rate_limit_rate)
+        # Pauses all requests while the Watts cloud keeps failing
+        self._circuitBreaker = CircuitBreaker(
+            CIRCUIT_BREAKER_THRESHOLD, timedelta(seconds=CIRCUIT_BREAKER_COOLDOWN)
+        )
+        self._metrics = RequestMetrics()
 
-    def test_authentication(self) -> bool:
+    async def test_authentication(self) -> bool:
         """Test if we can authenticate with the host."""
         try:
-            token = self.getLoginToken(True)
+            token = await self.getLoginToken(True)
             return token is not None
+        except WattsAuthenticationError:
+            return False
         except Exception:
             _LOGGER.exception("Authentication exception {exception}")
             return False
 
-    def getLoginToken(self, forcelogin=False):
+    async def async_load_tokens(self) -> None:
+        """Restore the tokens persisted by a previous run"""
+        data = await self._token_store.async_load()
+        if not data:
+            return
+
+        refresh_expires_in = datetime.fromisoformat(data["refresh_expires_in"])
+        if refresh_expires_in <= datetime.now():
+            _LOGGER.debug("Stored refresh token expired, a login is needed")
+            return
+
+        self._token = data["token"]
+        self._token_expires = datetime.fromisoformat(data["token_expires"])
+        self._refresh_token = data["refresh_token"]
+        self._refresh_expires_in = refresh_expires_in
+        _LOGGER.debug(
+            f"Restored access token till {self._token_expires}. refresh_token till {self._refresh_expires_in}"
+        )
+        self._scheduleTokenRefresh()
+
+    def _tokenData(self) -> dict:
+        """Return the tokens in their persisted form"""
+        return {
+            "token": self._token,
+            "token_expires": self._token_expires.isoformat(),
+            "refresh_token": self._refresh_token,
+            "refresh_expires_in": self._refresh_expires_in.isoformat(),
+        }
+
+    async def getLoginToken(self, forcelogin=False):
         """Get the access token for the Watts Smarthome API through login or refresh"""
+        # Concurrent callers share a single in-flight login or refresh
+        async with self._token_lock:
+            if (
+                not forcelogin
+                and self._token is not None
+                and self._token_expires > datetime.now()
+            ):
+                return self._token
+
+            return await self._requestToken(forcelogin)
+
+    async def _requestToken(self, forcelogin: bool):
+        """Request a token, falling back to a login when the refresh is refused"""
         now = datetime.now()
 
         if (
@@ -41,161 +200,528 @@ class WattsApi:
             or not self._refresh_expires_in
             or self._refresh_expires_in <= now
         ):
-            _LOGGER.debug("Login to get an access token.")
-            payload = {
-                "grant_type": "password",
-                "username": self._username,
-                "password": self._password,
-                "client_id": "app-front",
-            }
-        elif self._token_expires <= now:
-            _LOGGER.debug("Refreshing access token")
-            payload = {
-                "grant_type": "refresh_token",
-                "refresh_token": self._refresh_token,
-                "client_id": "app-front",
-            }
+            grantTypes = ["password"]
         else:
-            _LOGGER.debug("Getting token called unneeded.")
+            grantTypes = ["refresh_token", "password"]
+
+        for grantType in grantTypes:
+            if grantType == "password":
+                _LOGGER.debug("Login to get an access token.")
+                payload = {
+                    "grant_type": "password",
+                    "username": self._username,
+                    "password": self._password,
+                    "client_id": "app-front",
+                }
+            else:
+                _LOGGER.debug("Refreshing access token")
+                payload = {
+                    "grant_type": "refresh_token",
+                    "refresh_token": self._refresh_token,
+                    "client_id": "app-front",
+                }
+
+            # Every other request waits for the token, so it goes first
+            status, request_token_result = await self._post(
+                self._token_url, payload, auth=False, priority=Priority.INTERACTIVE
+            )
 
-        request_token_result = requests.post(
-            url="https://auth.smarthome.wattselectronics.com/realms/watts/protocol/openid-connect/token",
-            data=payload,
-        )
+            if status == 200:
+                self._storeToken(now, request_token_result)
+                return self._token
 
-        if request_token_result.status_code == 200:
-            token = request_token_result.json()["access_token"]
-            self._token = token
-            self._token_expires = now + timedelta(
-                seconds=request_token_result.json()["expires_in"]
-            )
-            self._refresh_token = request_token_result.json()["refresh_token"]
-            self._refresh_expires_in = now + timedelta(
-                seconds=request_token_result.json()["refresh_expires_in"]
-            )
-            _LOGGER.debug(
-                f"Received access token till {self._token_expires}. refresh_token till {self._refresh_expires_in}"
-            )
-            return token
-        _LOGGER.error(
-            "Something went wrong fetching the token for type {}: {} {}".format(
-                payload["grant_type"],
-                request_token_result.status_code,
-                request_token_result.json(),
+            _LOGGER.error(
+                f"Something went wrong fetching the token for type {grantType}: "
+                f"{status} {request_token_result}"
             )
+
+        raise WattsAuthenticationError(
+            f"Unable to get an access token for {self._username} (status {status})"
         )
-        if payload["grant_type"] == "refresh_token":
-            _LOGGER.error("Retrying with relogin")
-            return self.getLoginToken(True)
-        return None
 
-    def loadData(self):
-        """Load data from api"""
-        smarthomes = self.loadSmartHomes()
+    def _storeToken(self, now: datetime, request_token_result: dict) -> None:
+        """Store a received token and schedule its proactive refresh"""
+        self._token = request_token_result["access_token"]
+        self._token_expires = now + timedelta(
+            seconds=request_token_result["expires_in"]
+        )
+        self._refresh_token = request_token_result["refresh_token"]
+        self._refresh_expires_in = now + timedelta(
+            seconds=request_token_result["refresh_expires_in"]
+        )
+        _LOGGER.debug(
+            f"Received access token till {self._token_expires}. refresh_token till {self._refresh_expires_in}"
+        )
+        self._token_store.async_delay_save(self._tokenData, 0)
+        self._scheduleTokenRefresh()
+
+    def _scheduleTokenRefresh(self) -> None:
+        """Refresh the access token in the background shortly before it expires"""
+        if self._cancel_token_refresh is not None:
+            self._cancel_token_refresh()
+
+        delay = (
+            self._token_expires - datetime.now()
+        ).total_seconds() - TOKEN_REFRESH_MARGIN
+        self._cancel_token_refresh = async_call_later(
+            self._hass, max(delay, 0), self._refreshTokenInBackground
+        )
+
+    async def _refreshTokenInBackground(self, _now: datetime) -> None:
+        """Proactively refresh the access token"""
+        self._cancel_token_refresh = None
+        # The current token stays valid meanwhile, so requests are not held up
+        try:
+            async with self._token_lock:
+                await self._requestToken(False)
+        except (WattsApiError, ClientError, TimeoutError) as exception:
+            _LOGGER.warning("Background token refresh failed: %s", exception)
+
+    def close(self) -> None:
+        """Stop the background token refresh"""
+        if self._cancel_token_refresh is not None:
+            self._cancel_token_refresh()
+            self._cancel_token_refresh = None
+
+    async def async_load_snapshot(self) -> bool:
+        """Restore the topology and state saved by a previous run"""
+        smarthomes = await self._snapshot_store.async_load()
+        if not smarthomes:
+            return False
+
         self._smartHomeData = smarthomes
+        self._stale = True
+        self._rebuildDeviceIndex()
+        self._decodeDevices()
+        _LOGGER.debug("Restored %s smarthomes from snapshot", len(smarthomes))
+        return True
+
+    def isStale(self) -> bool:
+        """Return True until live data replaced the restored snapshot"""
+        return self._stale
+
+    def _snapshotData(self):
+        """Return the smarthomes in their persisted form"""
+        return self._smartHomeData
+
+    async def loadData(self, priority: Priority = Priority.BACKGROUND):
+        """Load data from api"""
+        self._changes = {}
+        # Raises on failure, keeping the known (possibly restored) smarthomes
+        self._smartHomeData = await self.loadSmartHomes(priority=priority)
 
-        return self.reloadDevices()
+        return await self.reloadDevices(priority)
 
-    def loadSmartHomes(self, firstTry: bool = True):
+    async def loadSmartHomes(
+        self, firstTry: bool = True, priority: Priority = Priority.BACKGROUND
+    ):
         """Load the user data"""
-        self._refresh_token_if_expired()
+        await self._refresh_token_if_expired()
 
-        headers = {"Authorization": f"Bearer {self._token}"}
         payload = {"token": "true", "email": self._username, "lang": "nl_NL"}
 
-        user_data_result = requests.post(
-            url="https://smarthome.wattselectronics.com/api/v0.1/human/user/read/",
-            headers=headers,
-            data=payload,
+        status, user_data_result = await self._post(
+            self._api_url + "user/read/", payload, priority=priority
         )
 
-        if self.check_response(user_data_result):
-            return user_data_result.json()["data"]["smarthomes"]
+        if self.check_response(status, user_data_result):
+            return user_data_result["data"]["smarthomes"]
 
-        return None
+        raise WattsApiError(f"Unable to load the smarthomes (status {status})")
 
-    def loadDevices(self, smarthome: str, firstTry: bool = True):
+    async def loadDevices(
+        self,
+        smarthome: str,
+        firstTry: bool = True,
+        priority: Priority = Priority.BACKGROUND,
+    ):
         """Load devices for smart home"""
-        self._refresh_token_if_expired()
+        start = time.monotonic()
+        await self._refresh_token_if_expired()
 
-        headers = {"Authorization": f"Bearer {self._token}"}
         payload = {"token": "true", "smarthome_id": smarthome, "lang": "nl_NL"}
 
-        devices_result = requests.post(
-            url="https://smarthome.wattselectronics.com/api/v0.1/human/smarthome/read/",
-            headers=headers,
-            data=payload,
+        status, devices_result = await self._post(
+            self._api_url + "smarthome/read/", payload, priority=priority
         )
+        # Includes waiting for the token, a request slot and retries
+        self._refreshDurations[smarthome] = time.monotonic() - start
         _LOGGER.debug("Load devices.")
 
-        if self.check_response(devices_result):
-            return devices_result.json()["data"]["zones"]
+        if self.check_response(status, devices_result):
+            return devices_result["data"]["zones"]
 
-        return None
+        raise WattsApiError(
+            f"Unable to load the devices of smarthome {smarthome} (status {status})"
+        )
 
-    def _refresh_token_if_expired(self) -> None:
+    async def _refresh_token_if_expired(self) -> None:
         """Check if token is expired and request a new one."""
-        now = datetime.now()
+        if self._token is None or self._token_expires <= datetime.now():
+            await self.getLoginToken()
 
-        timeout = 10
-        while self._refreshing_token and timeout != 0:
-            _LOGGER.debug("Refresh in action.")
-            time.sleep(1 / 10)
-            --timeout
+    async def _post(
+        self,
+        url: str,
+        payload: dict,
+        auth: bool = True,
+        priority: Priority = Priority.BACKGROUND,
+    ):
+        """Post a form to the Watts cloud and return the status and decoded body"""
+        if not self._circuitBreaker.allow_request():
+            raise WattsCircuitOpenError("Requests to the Watts cloud are paused")
 
-        if (self._token_expires and self._token_expires <= now) or (
-            self._refresh_expires_in and self._refresh_expires_in <= now
-        ):
-            self._refreshing_token = True
-            self.getLoginToken()
-            self._refreshing_token = False
+        token = self._token
+        try:
+            status, body = await self._postWithRetries(url, payload, auth, priority)
+            if status == 401 and auth:
+                # The token was refused before it expired, renew it once
+                await self._renewRefusedToken(token)
+                status, body = await self._postWithRetries(url, payload, auth, priority)
+            return status, body
+        except asyncio.CancelledError:
+            # Nothing is known about the cloud, let the next request probe it
+            self._circuitBreaker.release_probe()
+            raise
+        except Exception:
+            # Retries exhausted, or an error that is not retried like a cut off body
+            self._circuitBreaker.record_failure()
+            raise
+
+    async def _renewRefusedToken(self, refused: str | None) -> None:
+        """Get a new access token, unless a concurrent request already did"""
+        async with self._token_lock:
+            if self._token == refused:
+                _LOGGER.debug("Access token refused, requesting a new one")
+                await self._requestToken(False)
+
+    async def _postWithRetries(
+        self, url: str, payload: dict, auth: bool, priority: Priority
+    ):
+        """Send a request, retrying timeouts, connection errors and 5xx responses"""
+        for attempt in range(RETRY_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(
+                    backoff_delay(attempt - 1, RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX)
+                )
+            # Wait for the rate limit before taking one of the shared slots
+            await self._rateLimiter.acquire(priority)
+            try:
+                async with self._scheduler.slot(priority):
+                    status, body = await self._postOnce(url, payload, auth)
+            except (TimeoutError, ClientConnectionError) as exception:
+                _LOGGER.debug(f"Request to {url} failed: {exception!r}")
+                error = exception
+                continue
+            if status < 400:
+                self._circuitBreaker.record_success()
+                return status, body
+            if status < 500:
+                # Refused requests, e.g. an expired token, fail the same on a retry
+                self._circuitBreaker.record_failure()
+                return status, body
+            _LOGGER.debug(f"Request to {url} failed with status {status}")
+            error = None
+
+        if error is not None:
+            # Counted as a failure by _post
+            raise error
+        self._circuitBreaker.record_failure()
+        return status, body
+
+    async def _postOnce(self, url: str, payload: dict, auth: bool):
+        """Send a single request"""
+        headers = {"Authorization": f"Bearer {self._token}"} if auth else None
+        endpoint = self._endpointName(url)
+
+        start = time.monotonic()
+        try:
+            async with self._session.post(
+                url,
+                headers=headers,
+                data=payload,
+                timeout=ClientTimeout(total=REQUEST_TIMEOUT),
+            ) as response:
+                raw = await response.read()
+        except (TimeoutError, ClientError) as exception:
+            self._metrics.record_error(endpoint, type(exception).__name__)
+            raise
+        self._metrics.record(
+            endpoint,
+            time.monotonic() - start,
+            len(urlencode(payload)),
+            len(raw),
+        )
 
-    def reloadDevices(self):
-        """Load devices for each smart home"""
+        try:
+            body = json_loads(raw)
+        except ValueError:
+            body = None
+
+        if response.status != 200:
+            self._metrics.record_error(endpoint, str(response.status))
+        elif isinstance(body, dict) and "code" in body:
+            key = body["code"].get("key", "")
+            if "OK" not in key:
+                self._metrics.record_error(endpoint, str(response.status), key)
+        return response.status, body
+
+    def _endpointName(self, url: str) -> str:
+        """Get the metrics name of the endpoint of a url"""
+        if url == self._token_url:
+            return "token"
+        # sandbox/check_last_connexion/ -> check_last_connexion
+        return url.removeprefix(self._api_url).strip("/").removeprefix("sandbox/")
+
+    def getSchedulerStats(self) -> dict:
+        """Get the number of requests in flight and waiting for a slot"""
+        return {
+            "in_flight": self._scheduler.in_flight,
+            "queued": self._scheduler.queued,
+        }
+
+    def getRateLimiterStats(self) -> dict:
+        """Get the wait time metrics of the rate limiter"""
+        return self._rateLimiter.stats()
+
+    def getRequestMetrics(self) -> RequestMetrics:
+        """Get the per-endpoint request metrics"""
+        return self._metrics
+
+    def isAvailable(self) -> bool:
+        """Return False while requests are paused by the circuit breaker"""
+        return not self._circuitBreaker.is_open
+
+    async def reloadDevices(
+        self,
+        priority: Priority = Priority.BACKGROUND,
+        smarthomes: Collection[str] | None = None,
+    ):
+        """Load devices of each, or the given, smart homes, False if any failed"""
+        complete = True
         if self._smartHomeData is not None:
-            for y in range(len(self._smartHomeData)):
-                zones = self.loadDevices(self._smartHomeData[y]["smarthome_id"])
-                if zones != None:
-                    self._smartHomeData[y]["zones"] = zones
+            smartHomes = [
+                smartHome
+                for smartHome in self._smartHomeData
+                if smarthomes is None or smartHome["smarthome_id"] in smarthomes
+            ]
+            if not smartHomes:
+                self._changes = {}
+                return True
 
-        return True
+            # Data reported by a central unit after this point needs a new read
+            loaded = dt_util.utcnow()
+            results = await asyncio.gather(
+                *(
+                    self.loadDevices(smartHome["smarthome_id"], priority=priority)
+                    for smartHome in smartHomes
+                ),
+                return_exceptions=True,
+            )
+            if all(isinstance(zones, Exception) for zones in results):
+                # Nothing was refreshed, fail instead of reporting the old state
+                raise WattsApiError(
+                    f"Unable to load the devices of {len(results)} smarthomes"
+                ) from results[0]
+
+            # Device states before this reload, to detect what changed
+            previous = {
+                key: self.getDevice(*key)
+                for key in self._deviceIndex
+                if smarthomes is None or key[0] in smarthomes
+            }
+            wasStale = self._stale
+
+            # Merge all results in one step so readers never see a half reloaded state
+            replaced = set()
+            for smartHome, zones in zip(smartHomes, results, strict=False):
+                if isinstance(zones, Exception):
+                    _LOGGER.error(
+                        "Failed to load devices for smarthome %s: %s",
+                        smartHome["smarthome_id"],
+                        zones,
+                    )
+                    complete = False
+                elif zones is not None:
+                    smartHome["zones"] = zones
+                    self._devicesLoaded[smartHome["smarthome_id"]] = loaded
+                    replaced.add(smartHome["smarthome_id"])
+                else:
+                    complete = False
+
+            # Snapshot data is only replaced once every home was refreshed
+            if complete and len(smartHomes) == len(self._smartHomeData):
+                self._stale = False
+
+            self._rebuildDeviceIndex()
+            # Cached devices already carry their writes, only fresh reads confirm
+            for key in self._pendingWrites.keys():
+                if key[0] in replaced:
+                    self._pendingWrites.apply(key, self.getDevice(*key))
+
+            changes = self._diffDevices(previous, smarthomes)
+            # Forget devices that left the topology, only changed ones are decoded
+            for key in self._deviceStates.keys() - self._deviceIndex.keys():
+                del self._deviceStates[key]
+            self._decodeDevices(changes)
+            if wasStale != self._stale:
+                # The stale flag of every entity flipped
+                self._changes = None
+            else:
+                self._changes = changes
+
+        if not self._stale:
+            self._snapshot_store.async_delay_save(
+                self._snapshotData, SNAPSHOT_SAVE_DELAY
+            )
+
+        return complete
+
+    async def reloadChangedDevices(
+        self,
+        priority: Priority,
+        smarthomes: Collection[str],
+        maxAge: timedelta,
+    ):
+        """Load devices of the smart homes whose central unit reported new data"""
+        checked = await self.reloadLastCommunications(smarthomes)
+        now = dt_util.utcnow()
+        # The reported time is only known to the second and ignores latency
+        margin = timedelta(seconds=LAST_COMMUNICATION_MARGIN)
+        outdated = set()
+        for smarthome in smarthomes:
+            loaded = self._devicesLoaded.get(smarthome)
+            lastCommunication = self._lastCommunication.get(smarthome)
+            # Read when in doubt, and at least once every maxAge
+            if (
+                smarthome not in checked
+                or loaded is None
+                or lastCommunication is None
+                or lastCommunication >= loaded - margin
+                or now - loaded >= maxAge
+            ):
+                outdated.add(smarthome)
+
+        self._skippedReads += len(smarthomes) - len(outdated)
+        _LOGGER.debug(
+            "Reading %d of %d smarthomes with new data", len(outdated), len(smarthomes)
+        )
+        return await self.reloadDevices(priority, outdated)
 
     def getSmartHomes(self):
         """Get smarthomes"""
         return self._smartHomeData
 
+    def _diffDevices(
+        self, previous: dict, smarthomes: Collection[str] | None = None
+    ) -> dict:
+        """Return the changed fields of every device that changed"""
+        changes = {}
+        for key in self._deviceIndex:
+            if smarthomes is not None and key[0] not in smarthomes:
+                continue
+            device = self.getDevice(*key)
+            old = previous.get(key)
+            if old is None:
+                changes[key] = frozenset(device)
+            elif old != device:
+                changes[key] = frozenset(
+                    name
+                    for name in device.keys() | old.keys()
+                    if device.get(name) != old.get(name)
+                )
+        return changes
+
+    def getChanges(self) -> dict | None:
+        """Get the changed fields per device of the last reload, None if unknown"""
+        return self._changes
+
+    def _rebuildDeviceIndex(self):
+        """Index the devices by (smarthome_id, id) and (smarthome_id, id_device)"""
+        deviceIndex = {}
+        deviceIdIndex = {}
+        for smartHome in self._smartHomeData or []:
+            smarthome_id = smartHome["smarthome_id"]
+            for zone in smartHome.get("zones") or []:
+                devices = zone.get("devices") or []
+                for position, device in enumerate(devices):
+                    # Keep the containing list so setDevice can replace the entry
+                    location = (devices, position)
+                    deviceIndex[(smarthome_id, device["id"])] = location
+                    deviceIdIndex[(smarthome_id, device["id_device"])] = location
+
+        self._deviceIndex = deviceIndex
+        self._deviceIdIndex = deviceIdIndex
+
+    def _decodeDevices(self, keys=None):
+        """Decode the payload of the given devices, of all devices when None"""
+        if keys is None:
+            self._deviceStates = {}
+            keys = self._deviceIndex
+
+        for key in keys:
+            try:
+                self._deviceStates[key] = WattsDevice.from_payload(self.getDevice(*key))
+            except (KeyError, TypeError, ValueError) as exception:
+                _LOGGER.warning("Unable to decode device %s: %r", key, exception)
+                self._deviceStates.pop(key, None)
+
+    def setPendingWrite(self, smarthome: str, deviceId: str, value: str, gvMode: str):
+        """Optimistically set the fields of a push until the cloud confirms them"""
+        fields = {"gv_mode": gvMode, **_pushedSetpoints(value, gvMode)}
+        mode = _DEVICE_TO_MODE_TYPE.get(gvMode)
+        if mode is not None and mode.heat_mode == HeatMode.PROGRAM:
+            # The program sets the manual setpoint of its current period
+            fields.pop("consigne_manuel", None)
+        self._pendingWrites.add(smarthome, deviceId, fields)
+        device = self.getDevice(smarthome, deviceId)
+        if device is not None:
+            device.update(fields)
+            self._decodeDevices([(smarthome, deviceId)])
+        return {(smarthome, deviceId): frozenset(fields)}
+
+    def discardPendingWrite(self, smarthome: str, deviceId: str):
+        """Stop overlaying the fields of a write the cloud refused"""
+        self._pendingWrites.discard(smarthome, deviceId)
+
+    def getDeviceKeys(self) -> frozenset:
+        """Get the (smarthome_id, id) keys of all known devices"""
+        return frozenset(self._deviceIndex)
+
     def getDevice(self, smarthome: str, deviceId: str):
         """Get specific device"""
-        for y in range(len(self._smartHomeData)):
-            if self._smartHomeData[y]["smarthome_id"] == smarthome:
-                for z in range(len(self._smartHomeData[y]["zones"])):
-                    for x in range(len(self._smartHomeData[y]["zones"][z]["devices"])):
-                        if (
-                            self._smartHomeData[y]["zones"][z]["devices"][x]["id"]
-                            == deviceId
-                        ):
-                            return self._smartHomeData[y]["zones"][z]["devices"][x]
-
-        return None
+        location = self._deviceIndex.get((smarthome, deviceId))
+        if location is None:
+            return None
+        devices, position = location
+        return devices[position]
+
+    def getDeviceState(self, smarthome: str, deviceId: str) -> WattsDevice | None:
+        """Get the decoded state of a specific device"""
+        return self._deviceStates.get((smarthome, deviceId))
+
+    def getDeviceByDeviceId(self, smarthome: str, deviceID: str):
+        """Get specific device by its id_device"""
+        location = self._deviceIdIndex.get((smarthome, deviceID))
+        if location is None:
+            return None
+        devices, position = location
+        return devices[position]
 
     def setDevice(self, smarthome: str, deviceId: str, newState: str):
         """Set specific device"""
-        for y in range(len(self._smartHomeData)):
-            if self._smartHomeData[y]["smarthome_id"] == smarthome:
-                for z in range(len(self._smartHomeData[y]["zones"])):
-                    for x in range(len(self._smartHomeData[y]["zones"][z]["devices"])):
-                        if (
-                            self._smartHomeData[y]["zones"][z]["devices"][x]["id"]
-                            == deviceId
-                        ):
-                            # If device is found, overwrite it with the new state
-                            self._smartHomeData[y]["zones"][z]["devices"][x] = newState
-                            _LOGGER.debug(f"setDevice {deviceId} {newState}")
-                            return self._smartHomeData[y]["zones"][z]["devices"][x]
-
-        return None
-
-    def pushTemperature(
+        location = self._deviceIndex.get((smarthome, deviceId))
+        if location is None:
+            return None
+
+        # If device is found, overwrite it with the new state
+        devices, position = location
+        devices[position] = newState
+        self._decodeDevices([(smarthome, deviceId)])
+        _LOGGER.debug(f"setDevice {deviceId} {newState}")
+        return devices[position]
+
+    async def pushTemperature(
         self,
         smarthome: str,
         deviceID: str,
@@ -203,9 +729,8 @@ class WattsApi:
         gvMode: str,
         firstTry: bool = True,
     ):
-        self._refresh_token_if_expired()
+        await self._refresh_token_if_expired()
 
-        headers = {"Authorization": f"Bearer {self._token}"}
         payload = {
             "token": "true",
             "context": "1",
@@ -217,75 +742,97 @@ class WattsApi:
             "peremption": "15000",
             "lang": "nl_NL",
         }
-        extrapayload = {}
-        if gvMode == "0":
-            extrapayload = {
-                "query[consigne_confort]": value,
-                "query[consigne_manuel]": value,
-            }
-        elif gvMode == "1":
-            extrapayload = {
-                "query[consigne_manuel]": "0",
-            }
-        elif gvMode == "2":
-            extrapayload = {
-                "query[consigne_hg]": "446",
-                "query[consigne_manuel]": "446",
-                "peremption": "20000",
-            }
-        elif gvMode == "3":
-            extrapayload = {
-                "query[consigne_eco]": value,
-                "query[consigne_manuel]": value,
-            }
+        for name, setpoint in _pushedSetpoints(value, gvMode).items():
+            payload[f"query[{name}]"] = setpoint
+        if gvMode == "2":
+            payload["peremption"] = "20000"
         elif gvMode == "4":
-            extrapayload = {
-                "query[time_boost]": "7200",
-                "query[consigne_boost]": value,
-                "query[consigne_manuel]": value,
-            }
-        elif gvMode == "11":
-            extrapayload = {
-                "query[consigne_manuel]": value,
-            }
-        payload.update(extrapayload)
+            payload["query[time_boost]"] = "7200"
         _LOGGER.debug(
             f"pushTemp {value}. mode {gvMode} smarthome {smarthome} device {deviceID}"
         )
 
-        push_result = requests.post(
-            url="https://smarthome.wattselectronics.com/api/v0.1/human/query/push/",
-            headers=headers,
-            data=payload,
+        status, push_result = await self._post(
+            self._api_url + "query/push/", payload, priority=Priority.INTERACTIVE
         )
 
-        if self.check_response(push_result):
+        if self.check_response(status, push_result):
             return True
         _LOGGER.debug("pushTemp failed")
         return False
 
-    def getLastCommunication(self, smarthome: str, firstTry: bool = True):
-        self._refresh_token_if_expired()
+    async def getLastCommunication(self, smarthome: str, firstTry: bool = True):
+        await self._refresh_token_if_expired()
 
-        headers = {"Authorization": f"Bearer {self._token}"}
         payload = {"token": "true", "smarthome_id": smarthome, "lang": "nl_NL"}
 
-        last_connection_result = requests.post(
-            url="https://smarthome.wattselectronics.com/api/v0.1/human/sandbox/check_last_connexion/",
-            headers=headers,
-            data=payload,
+        status, last_connection_result = await self._post(
+            self._api_url + "sandbox/check_last_connexion/", payload
         )
 
-        if self.check_response(last_connection_result):
-            return last_connection_result.json()["data"]
+        if self.check_response(status, last_connection_result):
+            return last_connection_result["data"]
 
         return None
 
-    @staticmethod
-    def check_response(response: requests.Response) -> bool:
-        if response.status_code == 200:
-            if "OK" in response.json()["code"]["key"]:
+    async def reloadLastCommunications(
+        self, smarthomes: Collection[str] | None = None
+    ) -> set[str]:
+        """Load the last communication time of each, or the given, central unit"""
+        smartHomes = [
+            smartHome
+            for smartHome in self._smartHomeData or []
+            if smarthomes is None or smartHome["smarthome_id"] in smarthomes
+        ]
+
+        now = dt_util.utcnow()
+        results = await asyncio.gather(
+            *(
+                self.getLastCommunication(smartHome["smarthome_id"])
+                for smartHome in smartHomes
+            ),
+            return_exceptions=True,
+        )
+
+        loaded = set()
+        for smartHome, data in zip(smartHomes, results, strict=False):
+            if isinstance(data, Exception) or data is None:
+                _LOGGER.warning(
+                    "Failed to load last communication for smarthome %s: %s",
+                    smartHome["smarthome_id"],
+                    data,
+                )
+                continue
+            try:
+                diff = data["diffObj"]
+                lastCommunication = now - timedelta(
+                    days=int(diff["days"]),
+                    hours=int(diff["hours"]),
+                    minutes=int(diff["minutes"]),
+                    seconds=int(diff["seconds"]),
+                )
+            except (KeyError, TypeError, ValueError) as exception:
+                # One malformed answer must not drop the other homes
+                _LOGGER.warning(
+                    "Unexpected last communication for smarthome %s: %r",
+                    smartHome["smarthome_id"],
+                    exception,
+                )
+                continue
+            self._lastCommunication[smartHome["smarthome_id"]] = lastCommunication
+            loaded.add(smartHome["smarthome_id"])
+
+        return loaded
+
+    def getLastCommunicationTime(self, smarthome: str) -> datetime | None:
+        """Get when the central unit last talked to the cloud"""
+        return self._lastCommunication.get(smarthome)
+
+    def check_response(self, status: int, response: dict | None) -> bool:
+        if status == 200 and response is not None:
+            if "OK" in response["code"]["key"]:
                 return True
+            self._recordError(status, response["code"])
             # raise APIException("Code: {0}, key: {1}, value: {2}".format(
             #     response.json()["code"]["code"],
             #     response.json()["code"]["key"],
@@ -293,20 +840,63 @@ class WattsApi:
             # ))
             _LOGGER.error(
                 "Something went wrong fetching user data. Code: {}, Key: {}, Value: {}, Data: {}".format(
-                    response.json()["code"]["code"],
-                    response.json()["code"]["key"],
-                    response.json()["code"]["value"],
-                    response.json()["data"],
+                    response["code"]["code"],
+                    response["code"]["key"],
+                    response["code"]["value"],
+                    response["data"],
                 )
             )
             return False
         # raise UnHandledStatuException(response.status_code)
-        _LOGGER.error(
-            f"Unexpected status code {response.status_code} {response.json()}"
-        )
+        _LOGGER.error(f"Unexpected status code {status} {response}")
+        self._recordError(status, None)
 
-        if response.status_code == 401:
+        if status == 401:
             # raise UnauthorizedException("Unauthorized")
             _LOGGER.error("Unauthorized")
 
         return False
+
+    def _recordError(self, status: int, code: dict | None) -> None:
+        """Keep a failed response for the diagnostics"""
+        self._recentErrors.append(
+            {
+                "time": dt_util.utcnow().isoformat(),
+                "status": status,
+                "code": code,
+            }
+        )
+
+    def getDiagnostics(self) -> dict:
+        """Get the internal state that explains slow or failing updates"""
+        return {
+            "smarthomes": len(self._smartHomeData or []),
+            "devices": len(self._deviceIndex),
+            "device_id_index": len(self._deviceIdIndex),
+            "stale": self._stale,
+            "pending_writes": len(self._pendingWrites),
+            "last_communication": {
+                smarthome: lastCommunication.isoformat()
+                for smarthome, lastCommunication in self._lastCommunication.items()
+            },
+            "refresh_durations": {
+                smarthome: round(duration, 3)
+                for smarthome, duration in self._refreshDurations.items()
+            },
+            "devices_loaded": {
+                smarthome: loaded.isoformat()
+                for smarthome, loaded in self._devicesLoaded.items()
+            },
+            "skipped_reads": self._skippedReads,
+            "token_expires": self._token_expires.isoformat()
+            if self._token_expires
+            else None,
+            "refresh_expires_in": self._refresh_expires_in.isoformat()
+            if self._refresh_expires_in
+            else None,
+            "scheduler": self.getSchedulerStats(),
+            "rate_limiter": self.getRateLimiterStats(),
+            "circuit_open": not self.isAvailable(),
+            "requests": self._metrics.stats(),
+            "recent_errors": list(self._recentErrors),
+        }
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Watts Vision hot paths.
+
+Runs against the local mock cloud (scripts/mock_cloud.py) and measures:
+
+- lookup:  WattsApi.getDevice / getDeviceState / setDevice cost per call
+- refresh: loadData / reloadDevices wall time per fleet size
+- entity:  cost of deriving the state of every entity type
+- setup:   end-to-end async_setup_entry time
+
+Results are written as JSON so runs of different versions can be compared:
+
+    python scripts/benchmark.py --homes 1 10 100 500 --output bench.json
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from aiohttp import web
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from homeassistant import bootstrap, config_entries, loader  # noqa: E402
+from homeassistant.components import network  # noqa: E402
+from homeassistant.const import (  # noqa: E402
+    CONF_PASSWORD,
+    CONF_SCAN_INTERVAL,
+    CONF_USERNAME,
+)
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.setup import async_setup_component  # noqa: E402
+from mock_cloud import API_PATH, TOKEN_PATH, MockSettings, MockWattsCloud  # noqa: E402
+
+from custom_components import watts_vision  # noqa: E402
+from custom_components.watts_vision.binary_sensor import (  # noqa: E402
+    WattsVisionHeatingBinarySensor,
+)
+from custom_components.watts_vision.climate import WattsThermostat  # noqa: E402
+from custom_components.watts_vision.const import DOMAIN  # noqa: E402
+from custom_components.watts_vision.coordinator import (  # noqa: E402
+    WattsVisionCoordinator,
+)
+from custom_components.watts_vision.sensor import (  # noqa: E402
+    WattsVisionBatterySensor,
+    WattsVisionPresetModeSensor,
+    WattsVisionSetTemperatureSensor,
+    WattsVisionTemperatureModeSensor,
+    WattsVisionTemperatureSensor,
+)
+from custom_components.watts_vision.topology import Topology  # noqa: E402
+from custom_components.watts_vision.watts_api import WattsApi  # noqa: E402
+
+_ENTITY_TYPES = [
+    WattsThermostat,
+    WattsVisionHeatingBinarySensor,
+    WattsVisionPresetModeSensor,
+    WattsVisionTemperatureModeSensor,
+    WattsVisionTemperatureSensor,
+    WattsVisionSetTemperatureSensor,
+    WattsVisionBatterySensor,
+]
+
+
+class MockServer:
+    """Runs a mock Watts cloud for one fleet size."""
+
+    def __init__(self, settings: MockSettings):
+        self.cloud = MockWattsCloud(settings)
+        self._runner = None
+        self.base_url = None
+
+    async def __aenter__(self):
+        self._runner = web.AppRunner(self.cloud.create_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._runner.cleanup()
+
+    def client(self, hass: HomeAssistant) -> WattsApi:
+        return WattsApi(
+            hass,
+            "benchmark@example.com",
+            "benchmark",
+            token_url=self.base_url + TOKEN_PATH,
+            api_url=self.base_url + API_PATH,
+        )
+
+    def patch_setup(self):
+        """Point the clients created by the integration setup at the server."""
+        return patch.object(
+            watts_vision,
+            "WattsApi",
+            functools.partial(
+                WattsApi,
+                token_url=self.base_url + TOKEN_PATH,
+                api_url=self.base_url + API_PATH,
+            ),
+        )
+
+
+def _summary(samples: list[float]) -> dict:
+    """Summarize timings in seconds."""
+    return {
+        "samples": len(samples),
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "max": max(samples),
+    }
+
+
+def _per_call(func, calls: int) -> float:
+    """Return the mean duration of a call in seconds."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls
+
+
+async def bench_lookup(hass, settings: MockSettings, calls: int) -> dict:
+    async with MockServer(settings) as server:
+        client = server.client(hass)
+        await client.loadData()
+        keys = sorted(client.getDeviceKeys())
+        devices = [client.getDevice(*key) for key in keys]
+        client.close()
+
+    def get():
+        for key in keys:
+            client.getDevice(*key)
+
+    def get_state():
+        for key in keys:
+            client.getDeviceState(*key)
+
+    def set_():
+        for key, device in zip(keys, devices, strict=False):
+            client.setDevice(*key, device)
+
+    rounds = max(calls // len(keys), 1)
+    return {
+        "devices": len(keys),
+        "getDevice": _per_call(get, rounds) / len(keys),
+        "getDeviceState": _per_call(get_state, rounds) / len(keys),
+        "setDevice": _per_call(set_, rounds) / len(keys),
+    }
+
+
+async def bench_refresh(hass, settings: MockSettings, rounds: int) -> dict:
+    async with MockServer(settings) as server:
+        load, reload = [], []
+        for _ in range(rounds):
+            client = server.client(hass)
+            await client.getLoginToken()
+            start = time.perf_counter()
+            await client.loadData()
+            load.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            await client.reloadDevices()
+            reload.append(time.perf_counter() - start)
+            client.close()
+        return {
+            "devices": len(client.getDeviceKeys()),
+            "requests": server.cloud.requests,
+            "loadData": _summary(load),
+            "reloadDevices": _summary(reload),
+        }
+
+
+async def bench_entities(hass, settings: MockSettings, calls: int) -> dict:
+    entry = config_entries.ConfigEntry(
+        data={CONF_USERNAME: "benchmark", CONF_PASSWORD: "benchmark"},
+        discovery_keys={},
+        domain=DOMAIN,
+        minor_version=1,
+        options={},
+        source=config_entries.SOURCE_USER,
+        subentries_data=None,
+        title="benchmark",
+        unique_id=None,
+        version=1,
+    )
+    async with MockServer(settings) as server:
+        client = server.client(hass)
+        await client.loadData()
+        client.close()
+
+    coordinator = WattsVisionCoordinator(hass, entry, client, timedelta(seconds=300))
+    thermostat = Topology.from_smarthomes(client.getSmartHomes()).thermostats[0]
+
+    results = {}
+    for entity_type in _ENTITY_TYPES:
+        entity = entity_type(coordinator, thermostat)
+        entity.hass = hass
+        results[entity_type.__name__] = {
+            "update": _per_call(entity._update_attrs, calls),
+            "device_info": _per_call(lambda entity=entity: entity.device_info, calls),
+        }
+    return results
+
+
+async def async_create_hass(config_dir: str) -> HomeAssistant:
+    """Return a minimal Home Assistant instance that can set up config entries."""
+    hass = HomeAssistant(config_dir)
+    loader.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    # Registries, config entries and the helpers entity platforms rely on
+    await bootstrap.async_load_base_functionality(hass)
+    await async_setup_component(hass, "homeassistant", {})
+    # The shared HTTP session resolves names with the loaded network adapters
+    await network.async_get_adapters(hass)
+    return hass
+
+
+async def bench_setup(settings: MockSettings, rounds: int) -> dict:
+    samples = []
+    entities = 0
+    async with MockServer(settings) as server:
+        for _ in range(rounds):
+            with tempfile.TemporaryDirectory() as config_dir:
+                # The integration is loaded from the repository
+                Path(config_dir, "custom_components").symlink_to(
+                    ROOT / "custom_components"
+                )
+                hass = await async_create_hass(config_dir)
+                entry = config_entries.ConfigEntry(
+                    data={
+                        CONF_USERNAME: "benchmark@example.com",
+                        CONF_PASSWORD: "benchmark",
+                        CONF_SCAN_INTERVAL: 300,
+                    },
+                    discovery_keys={},
+                    domain=DOMAIN,
+                    minor_version=1,
+                    options={},
+                    source=config_entries.SOURCE_USER,
+                    subentries_data=None,
+                    title="benchmark",
+                    unique_id=None,
+                    version=1,
+                )
+
+                start = time.perf_counter()
+                with server.patch_setup():
+                    await hass.config_entries.async_add(entry)
+                    await hass.async_block_till_done()
+                samples.append(time.perf_counter() - start)
+                entities = len(hass.states.async_all())
+
+                # Let the last communication fetch finish before the server stops
+                await hass.async_block_till_done(wait_background_tasks=True)
+
+                await hass.async_stop(force=True)
+    return {"entities": entities, "async_setup_entry": _summary(samples)}
+
+
+def _revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    results = {
+        "revision": _revision(),
+        "python": platform.python_version(),
+        "settings": vars(args),
+        "lookup": {},
+        "refresh": {},
+        "setup": {},
+    }
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await async_create_hass(config_dir)
+        for homes in args.homes:
+            settings = MockSettings(
+                homes=homes,
+                zones=args.zones,
+                devices=args.devices,
+                latency=args.latency,
+                seed=0,
+            )
+            print(f"Benchmarking {homes} homes", file=sys.stderr)
+            results["lookup"][homes] = await bench_lookup(hass, settings, args.calls)
+            results["refresh"][homes] = await bench_refresh(hass, settings, args.rounds)
+            results["setup"][homes] = await bench_setup(settings, args.setup_rounds)
+
+        results["entity"] = await bench_entities(hass, MockSettings(seed=0), args.calls)
+        await hass.async_stop(force=True)
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--homes", type=int, nargs="+", default=[1, 10, 100, 500])
+    parser.add_argument("--zones", type=int, default=3, help="zones per home")
+    parser.add_argument("--devices", type=int, default=1, help="devices per zone")
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="mock cloud latency in seconds"
+    )
+    parser.add_argument("--rounds", type=int, default=5, help="refresh rounds")
+    parser.add_argument("--setup-rounds", type=int, default=3)
+    parser.add_argument("--calls", type=int, default=10000, help="calls per timing")
+    parser.add_argument("--output", default="bench_output.json")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
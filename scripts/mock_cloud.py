@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Watts Vision cloud.
+
+Serves the token, user/read, smarthome/read, query/push and
+check_last_connexion endpoints for a synthetic fleet of configurable size,
+with optional latency and errors. Point WattsApi at it with:
+
+    WattsApi(hass, user, password,
+             token_url="http://127.0.0.1:8080" + TOKEN_PATH,
+             api_url="http://127.0.0.1:8080" + API_PATH)
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+import uuid
+from dataclasses import dataclass
+
+from aiohttp import web
+
+_LOGGER = logging.getLogger(__name__)
+
+TOKEN_PATH = "/realms/watts/protocol/openid-connect/token"
+API_PATH = "/api/v0.1/human/"
+
+# Setpoints are in tenths of a degree Fahrenheit, like the real cloud
+_CONSIGNES = {
+    "consigne_confort": "680",
+    "consigne_eco": "608",
+    "consigne_hg": "446",
+    "consigne_boost": "770",
+    "consigne_manuel": "680",
+}
+
+_PUSH_FIELDS = [
+    "gv_mode",
+    "nv_mode",
+    "time_boost",
+    "consigne_confort",
+    "consigne_eco",
+    "consigne_hg",
+    "consigne_boost",
+    "consigne_manuel",
+]
+
+
+@dataclass
+class MockSettings:
+    """Size of the synthetic fleet and injected faults."""
+
+    homes: int = 1
+    zones: int = 2
+    devices: int = 1
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    change_rate: float = 0.0
+    token_lifetime: int = 300
+    seed: int | None = None
+
+
+def build_fleet(settings: MockSettings, rnd: random.Random) -> dict:
+    """Generate the smarthomes, zones and devices of the fleet."""
+    fleet = {}
+    for h in range(settings.homes):
+        smarthome_id = f"{h:04d}-{uuid.UUID(int=rnd.getrandbits(128))}"
+        zones = []
+        for z in range(settings.zones):
+            devices = []
+            for d in range(settings.devices):
+                number = z * settings.devices + d
+                devices.append(
+                    {
+                        "id": f"{smarthome_id}#C001-{number:03d}",
+                        "id_device": f"C001-{number:03d}",
+                        "gv_mode": "0",
+                        "nv_mode": "0",
+                        "heating_up": rnd.choice(["0", "1"]),
+                        "heat_cool": "0",
+                        "error_code": 0,
+                        "temperature_air": str(rnd.randint(600, 720)),
+                        "min_set_point": "410",
+                        "max_set_point": "860",
+                        "time_boost": "0",
+                        **_CONSIGNES,
+                    }
+                )
+            zones.append(
+                {"num_zone": str(z), "zone_label": f"Zone {h}-{z}", "devices": devices}
+            )
+        fleet[smarthome_id] = {
+            "smarthome_id": smarthome_id,
+            "label": f"Home {h}",
+            "mac_address": ":".join(f"{rnd.randrange(256):02X}" for _ in range(6)),
+            "zones": zones,
+            # When the central unit last talked to the cloud
+            "last_connection": time.time() - rnd.randint(0, 600),
+        }
+    return fleet
+
+
+class MockWattsCloud:
+    """In-memory Watts cloud."""
+
+    def __init__(self, settings: MockSettings):
+        self.settings = settings
+        self._random = random.Random(settings.seed)
+        self.fleet = build_fleet(settings, self._random)
+        self.tokens: set[str] = set()
+        self.requests: dict[str, int] = {}
+
+    def create_app(self) -> web.Application:
+        """Return the aiohttp application serving the endpoints."""
+        app = web.Application(middlewares=[self._faults])
+        app.router.add_post(TOKEN_PATH, self.token)
+        app.router.add_post(API_PATH + "user/read/", self.user_read)
+        app.router.add_post(API_PATH + "smarthome/read/", self.smarthome_read)
+        app.router.add_post(API_PATH + "query/push/", self.query_push)
+        app.router.add_post(
+            API_PATH + "sandbox/check_last_connexion/", self.check_last_connexion
+        )
+        return app
+
+    @web.middleware
+    async def _faults(self, request: web.Request, handler):
+        """Count requests and inject latency and errors."""
+        self.requests[request.path] = self.requests.get(request.path, 0) + 1
+        delay = self.settings.latency + self._random.uniform(0, self.settings.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if self._random.random() < self.settings.error_rate:
+            return web.Response(status=503, text="Service Unavailable")
+        return await handler(request)
+
+    @staticmethod
+    def _ok(data) -> web.Response:
+        return web.json_response(
+            {"code": {"code": "1", "key": "OK", "value": "OK"}, "data": data}
+        )
+
+    @staticmethod
+    def _error(key: str, value: str) -> web.Response:
+        return web.json_response(
+            {"code": {"code": "0", "key": key, "value": value}, "data": []}
+        )
+
+    def _authorized(self, request: web.Request) -> bool:
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        return token in self.tokens
+
+    async def token(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        if (
+            form.get("grant_type") == "refresh_token"
+            and form.get("refresh_token") not in self.tokens
+        ):
+            return web.json_response({"error": "invalid_grant"}, status=400)
+
+        access_token = uuid.uuid4().hex
+        refresh_token = uuid.uuid4().hex
+        self.tokens.update((access_token, refresh_token))
+        return web.json_response(
+            {
+                "access_token": access_token,
+                "expires_in": self.settings.token_lifetime,
+                "refresh_token": refresh_token,
+                "refresh_expires_in": self.settings.token_lifetime * 6,
+            }
+        )
+
+    async def user_read(self, request: web.Request) -> web.Response:
+        if not self._authorized(request):
+            return web.json_response({"error": "unauthorized"}, status=401)
+        smarthomes = [
+            {key: value for key, value in home.items() if key != "last_connection"}
+            for home in self.fleet.values()
+        ]
+        return self._ok({"smarthomes": smarthomes})
+
+    async def smarthome_read(self, request: web.Request) -> web.Response:
+        if not self._authorized(request):
+            return web.json_response({"error": "unauthorized"}, status=401)
+        form = await request.post()
+        home = self.fleet.get(form.get("smarthome_id"))
+        if home is None:
+            return self._error("ERR_SMARTHOME", "Unknown smarthome")
+
+        # Let a share of the devices drift, so refreshes see changes
+        for zone in home["zones"]:
+            for device in zone["devices"]:
+                if self._random.random() < self.settings.change_rate:
+                    device["temperature_air"] = str(
+                        int(device["temperature_air"]) + self._random.choice([-1, 1])
+                    )
+                    device["heating_up"] = self._random.choice(["0", "1"])
+                    home["last_connection"] = time.time()
+        return self._ok({"zones": home["zones"]})
+
+    async def query_push(self, request: web.Request) -> web.Response:
+        if not self._authorized(request):
+            return web.json_response({"error": "unauthorized"}, status=401)
+        form = await request.post()
+        home = self.fleet.get(form.get("smarthome_id"))
+        if home is None:
+            return self._error("ERR_SMARTHOME", "Unknown smarthome")
+
+        for zone in home["zones"]:
+            for device in zone["devices"]:
+                if device["id_device"] == form.get("query[id_device]"):
+                    for field in _PUSH_FIELDS:
+                        if f"query[{field}]" in form:
+                            device[field] = form[f"query[{field}]"]
+                    return self._ok([])
+        return self._error("ERR_DEVICE", "Unknown device")
+
+    async def check_last_connexion(self, request: web.Request) -> web.Response:
+        if not self._authorized(request):
+            return web.json_response({"error": "unauthorized"}, status=401)
+        form = await request.post()
+        home = self.fleet.get(form.get("smarthome_id"))
+        if home is None:
+            return self._error("ERR_SMARTHOME", "Unknown smarthome")
+
+        seconds = int(time.time() - home["last_connection"])
+        return self._ok(
+            {
+                "diffObj": {
+                    "days": seconds // 86400,
+                    "hours": seconds // 3600 % 24,
+                    "minutes": seconds // 60 % 60,
+                    "seconds": seconds % 60,
+                }
+            }
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--homes", type=int, default=1)
+    parser.add_argument("--zones", type=int, default=2, help="zones per home")
+    parser.add_argument("--devices", type=int, default=1, help="devices per zone")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--change-rate",
+        type=float,
+        default=0.0,
+        help="share of devices that change on every smarthome/read",
+    )
+    parser.add_argument("--token-lifetime", type=int, default=300, help="seconds")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    cloud = MockWattsCloud(
+        MockSettings(
+            homes=args.homes,
+            zones=args.zones,
+            devices=args.devices,
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            change_rate=args.change_rate,
+            token_lifetime=args.token_lifetime,
+            seed=args.seed,
+        )
+    )
+    _LOGGER.info(
+        "Serving %s homes, token url http://%s:%s%s, api url http://%s:%s%s",
+        args.homes,
+        args.host,
+        args.port,
+        TOKEN_PATH,
+        args.host,
+        args.port,
+        API_PATH,
+    )
+    web.run_app(cloud.create_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Tests for the Watts Vision integration."""
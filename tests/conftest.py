@@ -0,0 +1,118 @@
+"""Fixtures for the Watts Vision tests."""
+
+import functools
+import sys
+from collections.abc import AsyncGenerator, Generator
+from dataclasses import dataclass
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from aiohttp import web
+from homeassistant.const import CONF_PASSWORD, CONF_SCAN_INTERVAL, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.watts_vision.const import DOMAIN
+from custom_components.watts_vision.watts_api import WattsApi
+
+# The mock cloud is a development script next to the benchmark
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+from mock_cloud import (
+    API_PATH,
+    TOKEN_PATH,
+    MockSettings,
+    MockWattsCloud,
+)
+
+
+@dataclass
+class CloudServer:
+    """A mock Watts cloud served on localhost."""
+
+    cloud: MockWattsCloud
+    token_url: str
+    api_url: str
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Load the integration from custom_components."""
+
+
+@pytest.fixture
+def mock_settings() -> MockSettings:
+    """Return the fleet served by the mock cloud."""
+    return MockSettings(homes=2, zones=2, seed=0)
+
+
+@pytest.fixture
+async def mock_cloud(
+    socket_enabled: None,  # noqa: ARG001
+    mock_settings: MockSettings,
+) -> AsyncGenerator[CloudServer]:
+    """Serve a mock Watts cloud for the test."""
+    cloud = MockWattsCloud(mock_settings)
+    runner = web.AppRunner(cloud.create_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # noqa: SLF001
+    base_url = f"http://127.0.0.1:{port}"
+    yield CloudServer(cloud, base_url + TOKEN_PATH, base_url + API_PATH)
+    await runner.cleanup()
+
+
+@pytest.fixture
+async def client(
+    hass: HomeAssistant, mock_cloud: CloudServer
+) -> AsyncGenerator[WattsApi]:
+    """Return an API client talking to the mock cloud."""
+    client = WattsApi(
+        hass,
+        "test@example.com",
+        "secret",
+        token_url=mock_cloud.token_url,
+        api_url=mock_cloud.api_url,
+    )
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def mock_api(mock_cloud: CloudServer) -> Generator[None]:
+    """Point the clients created by the integration at the mock cloud."""
+    api = functools.partial(
+        WattsApi, token_url=mock_cloud.token_url, api_url=mock_cloud.api_url
+    )
+    with (
+        patch("custom_components.watts_vision.WattsApi", api),
+        patch("custom_components.watts_vision.config_flow.WattsApi", api),
+    ):
+        yield
+
+
+@pytest.fixture
+def mock_config_entry() -> MockConfigEntry:
+    """Return a config entry for an account of the mock cloud."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_USERNAME: "test@example.com",
+            CONF_PASSWORD: "secret",
+            CONF_SCAN_INTERVAL: 300,
+        },
+    )
+
+
+@pytest.fixture
+async def config_entry(
+    hass: HomeAssistant,
+    mock_api: None,  # noqa: ARG001
+    mock_config_entry: MockConfigEntry,
+) -> MockConfigEntry:
+    """Set up the integration for an account of the mock cloud."""
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+    return mock_config_entry
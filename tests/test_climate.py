@@ -0,0 +1,51 @@
+"""Tests for the thermostat writes against the mock cloud."""
+
+from datetime import timedelta
+
+from homeassistant.components.climate import (
+    ATTR_TEMPERATURE,
+    SERVICE_SET_TEMPERATURE,
+)
+from homeassistant.components.climate import (
+    DOMAIN as CLIMATE_DOMAIN,
+)
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from homeassistant.util.unit_system import US_CUSTOMARY_SYSTEM
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.watts_vision.const import API_CLIENT, DOMAIN
+
+from .conftest import CloudServer
+
+_ENTITY_ID = "climate.zone_0_0_thermostat"
+
+
+async def test_write_shown_then_confirmed(
+    hass: HomeAssistant, mock_cloud: CloudServer, config_entry: MockConfigEntry
+) -> None:
+    """A new setpoint shows right away and is dropped once the cloud reports it."""
+    hass.config.units = US_CUSTOMARY_SYSTEM
+    client = hass.data[DOMAIN][config_entry.entry_id][API_CLIENT]
+
+    await hass.services.async_call(
+        CLIMATE_DOMAIN,
+        SERVICE_SET_TEMPERATURE,
+        {ATTR_ENTITY_ID: _ENTITY_ID, ATTR_TEMPERATURE: 72},
+    )
+    # Waits for the quiet window of the command queue
+    await hass.async_block_till_done()
+
+    assert hass.states.get(_ENTITY_ID).attributes[ATTR_TEMPERATURE] == 72
+    assert client.getDiagnostics()["pending_writes"] == 1
+    assert mock_cloud.cloud.requests["/api/v0.1/human/query/push/"] == 1
+
+    # The fast refresh after the write reads the new setpoint back
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=1))
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert client.getDiagnostics()["pending_writes"] == 0
+    assert hass.states.get(_ENTITY_ID).attributes[ATTR_TEMPERATURE] == 72
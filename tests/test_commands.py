@@ -0,0 +1,93 @@
+"""Tests for the debounced thermostat command queue."""
+
+import asyncio
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.watts_vision.commands import CommandQueue
+
+
+class _Client:
+    """Stand-in client that records the pushes."""
+
+    def __init__(self, error: Exception | None = None) -> None:
+        self.pushes = []
+        self._error = error
+
+    async def pushTemperature(  # noqa: N802
+        self,
+        smarthome: str,
+        deviceID: str,  # noqa: N803
+        value: str,
+        gvMode: str,  # noqa: N803
+    ) -> bool:
+        self.pushes.append((smarthome, deviceID, value, gvMode))
+        if self._error is not None:
+            raise self._error
+        return True
+
+
+async def test_writes_coalesce(hass: HomeAssistant) -> None:
+    """Rapid writes to a device result in a single push of the last state."""
+    client = _Client()
+    queue = CommandQueue(hass, client, delay=0.01)
+
+    results = await asyncio.gather(
+        queue.async_push_temperature("home", "C001", "680", "0"),
+        queue.async_push_temperature("home", "C001", "700", "0"),
+        queue.async_push_temperature("home", "C002", "620", "3"),
+    )
+
+    assert results == [True, True, True]
+    assert sorted(client.pushes) == [
+        ("home", "C001", "700", "0"),
+        ("home", "C002", "620", "3"),
+    ]
+
+
+async def test_push_error_reaches_every_caller(hass: HomeAssistant) -> None:
+    """A failed push raises for every coalesced write."""
+    queue = CommandQueue(hass, _Client(TimeoutError()), delay=0.01)
+
+    results = await asyncio.gather(
+        queue.async_push_temperature("home", "C001", "680", "0"),
+        queue.async_push_temperature("home", "C001", "700", "0"),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, TimeoutError) for result in results)
+
+
+async def test_flush_all(hass: HomeAssistant) -> None:
+    """Queued writes are pushed right away on shutdown."""
+    client = _Client()
+    queue = CommandQueue(hass, client, delay=3600)
+
+    write = asyncio.create_task(
+        queue.async_push_temperature("home", "C001", "700", "0")
+    )
+    await asyncio.sleep(0)
+    await queue.async_flush_all()
+
+    assert await write
+    assert client.pushes == [("home", "C001", "700", "0")]
+
+
+async def test_later_write_restarts_window(hass: HomeAssistant) -> None:
+    """Each write restarts the quiet window of its device."""
+    client = _Client()
+    queue = CommandQueue(hass, client, delay=0.2)
+
+    first = asyncio.create_task(
+        queue.async_push_temperature("home", "C001", "680", "0")
+    )
+    await asyncio.sleep(0.12)
+    second = asyncio.create_task(
+        queue.async_push_temperature("home", "C001", "700", "0")
+    )
+    await asyncio.sleep(0.12)
+    # The first window would have passed by now
+    assert client.pushes == []
+
+    await asyncio.gather(first, second)
+    assert client.pushes == [("home", "C001", "700", "0")]
@@ -0,0 +1,81 @@
+"""Tests for the config flow of the integration."""
+
+import pytest
+from homeassistant.config_entries import SOURCE_USER
+from homeassistant.const import CONF_PASSWORD, CONF_SCAN_INTERVAL, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.watts_vision.const import (
+    CONF_CONDITIONAL_REFRESH,
+    CONF_MAX_DATA_AGE,
+    DOMAIN,
+)
+
+_CREDENTIALS = {CONF_USERNAME: "test@example.com", CONF_PASSWORD: "secret"}
+
+
+@pytest.mark.usefixtures("mock_api")
+async def test_entry_has_account_unique_id(hass: HomeAssistant) -> None:
+    """The entry of an account is identified by its username."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], _CREDENTIALS
+    )
+    assert result["step_id"] == "settings"
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {
+            CONF_SCAN_INTERVAL: 300,
+            CONF_CONDITIONAL_REFRESH: False,
+            CONF_MAX_DATA_AGE: 3600,
+        },
+    )
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["result"].unique_id == "test_example_com"
+
+
+async def test_account_added_once(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> None:
+    """An account that is already configured cannot be added again."""
+    mock_config_entry.add_to_hass(hass)
+    hass.config_entries.async_update_entry(
+        mock_config_entry, unique_id="test_example_com"
+    )
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {**_CREDENTIALS, CONF_USERNAME: "Test@Example.com"}
+    )
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "already_configured"
+
+
+async def test_setup_sets_missing_unique_id(config_entry: MockConfigEntry) -> None:
+    """Entries created before the flow set a unique id get the one of their account."""
+    assert config_entry.unique_id == "test_example_com"
+
+
+async def test_duplicate_removal_keeps_stores(
+    hass: HomeAssistant, config_entry: MockConfigEntry, hass_storage: dict
+) -> None:
+    """Removing a duplicate entry of an account keeps the stores the other uses."""
+    duplicate = MockConfigEntry(domain=DOMAIN, data=dict(config_entry.data))
+    duplicate.add_to_hass(hass)
+    await hass.async_block_till_done()
+    assert "watts_vision.tokens.test_example_com" in hass_storage
+
+    await hass.config_entries.async_remove(duplicate.entry_id)
+    assert "watts_vision.tokens.test_example_com" in hass_storage
+
+    await hass.config_entries.async_remove(config_entry.entry_id)
+    assert "watts_vision.tokens.test_example_com" not in hass_storage
@@ -0,0 +1,77 @@
+"""Tests for the refresh cycle of the coordinator against the mock cloud."""
+
+from datetime import timedelta
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.watts_vision.const import (
+    COORDINATOR,
+    DOMAIN,
+    FAST_POLL_INTERVAL,
+)
+
+from .conftest import CloudServer
+
+_SMARTHOME_READ = "/api/v0.1/human/smarthome/read/"
+
+
+async def test_homes_refreshed_on_their_own_slot(
+    hass: HomeAssistant,
+    mock_cloud: CloudServer,
+    config_entry: MockConfigEntry,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Each refresh only reads the home whose slot came up."""
+    coordinator = hass.data[DOMAIN][config_entry.entry_id][COORDINATOR]
+    next_refreshes = coordinator.schedule.next_refreshes()
+    assert len(set(next_refreshes.values())) == 2
+    reads = mock_cloud.cloud.requests[_SMARTHOME_READ]
+
+    for home, slot in sorted(next_refreshes.items(), key=lambda item: item[1]):
+        freezer.move_to(slot)
+        async_fire_time_changed(hass)
+        # The interval refresh runs as a background task
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+        reads += 1
+        assert mock_cloud.cloud.requests[_SMARTHOME_READ] == reads
+        assert coordinator.schedule.next_refreshes()[home] > slot
+
+
+async def test_fast_polling_reads_active_home_only(
+    hass: HomeAssistant,
+    mock_cloud: CloudServer,
+    config_entry: MockConfigEntry,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """After a command only its home is polled quickly, the others keep their slot."""
+    coordinator = hass.data[DOMAIN][config_entry.entry_id][COORDINATOR]
+    next_refreshes = coordinator.schedule.next_refreshes()
+    active, other = sorted(next_refreshes, key=next_refreshes.get)
+    reads = mock_cloud.cloud.requests[_SMARTHOME_READ]
+
+    coordinator.async_activity(active)
+    freezer.tick(coordinator.update_interval)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert mock_cloud.cloud.requests[_SMARTHOME_READ] == reads + 1
+    assert coordinator.schedule.next_refreshes()[other] == next_refreshes[other]
+    assert coordinator.update_interval <= timedelta(seconds=FAST_POLL_INTERVAL)
+
+
+async def test_failed_reads_fail_the_refresh(
+    hass: HomeAssistant, mock_cloud: CloudServer, config_entry: MockConfigEntry
+) -> None:
+    """A refresh that could not read any home is reported as failed."""
+    coordinator = hass.data[DOMAIN][config_entry.entry_id][COORDINATOR]
+    mock_cloud.cloud.fleet.clear()
+
+    await coordinator.async_refresh()
+
+    assert not coordinator.last_update_success
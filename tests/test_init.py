@@ -0,0 +1,45 @@
+"""Tests for the setup and unload of the integration."""
+
+from unittest.mock import patch
+
+import pytest
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.watts_vision.const import API_CLIENT, DOMAIN
+from custom_components.watts_vision.exceptions import WattsApiError
+from custom_components.watts_vision.watts_api import WattsApi
+
+
+@pytest.mark.usefixtures("mock_api")
+async def test_failed_setup_stops_token_refresh(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> None:
+    """The token refresh of a client whose setup failed does not keep running."""
+    mock_config_entry.add_to_hass(hass)
+
+    with (
+        patch.object(WattsApi, "loadData", side_effect=WattsApiError),
+        patch.object(
+            WattsApi, "close", autospec=True, side_effect=WattsApi.close
+        ) as close,
+    ):
+        assert not await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert mock_config_entry.state is ConfigEntryState.SETUP_RETRY
+    close.assert_called_once()
+
+
+async def test_unload_stops_token_refresh(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Unloading the entry stops the token refresh of its client."""
+    client = hass.data[DOMAIN][config_entry.entry_id][API_CLIENT]
+    assert client._cancel_token_refresh is not None  # noqa: SLF001
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+    assert config_entry.state is ConfigEntryState.NOT_LOADED
+    assert client._cancel_token_refresh is None  # noqa: SLF001
@@ -0,0 +1,49 @@
+"""Tests for the decoded device state."""
+
+import pytest
+
+from custom_components.watts_vision.const import HeatMode, TempType
+from custom_components.watts_vision.models import WattsDevice
+
+
+def _payload(gv_mode: str) -> dict:
+    """Return a smarthome/read device in the given mode."""
+    return {
+        "id": "C1_1",
+        "id_device": "C1",
+        "gv_mode": gv_mode,
+        "heating_up": "1",
+        "heat_cool": "0",
+        "error_code": 0,
+        "temperature_air": "680",
+        "min_set_point": "410",
+        "max_set_point": "860",
+        "consigne_confort": "700",
+        "consigne_eco": "620",
+        "consigne_hg": "446",
+        "consigne_boost": "750",
+    }
+
+
+def test_known_mode() -> None:
+    """A known mode resolves the preset and its target temperature."""
+    device = WattsDevice.from_payload(_payload("3"))
+
+    assert device.heat_mode == HeatMode.ECO
+    assert device.temp_type == TempType.ECO
+    assert device.target_temperature == pytest.approx(62.0)
+
+
+@pytest.mark.parametrize("gv_mode", ["13", "15", "16"])
+def test_unknown_mode(gv_mode: str) -> None:
+    """An unknown mode still decodes the fields that do not depend on it."""
+    device = WattsDevice.from_payload(_payload(gv_mode))
+
+    assert device.gv_mode == gv_mode
+    assert device.heat_mode is None
+    assert device.temp_type is None
+    assert device.target_temperature is None
+    assert device.target_temperature_celsius is None
+    assert device.heating
+    assert device.temperature_air == pytest.approx(68.0)
+    assert device.temperature_air_celsius == pytest.approx(20.0)
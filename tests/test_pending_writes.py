@@ -0,0 +1,62 @@
+"""Tests for the overlay of unconfirmed device writes."""
+
+from datetime import timedelta
+
+from custom_components.watts_vision.pending_writes import PendingWrites
+
+_KEY = ("home", "C001")
+
+
+def test_overlay_until_confirmed() -> None:
+    """Written values replace fetched ones until the cloud reports them."""
+    writes = PendingWrites(timedelta(minutes=10))
+    writes.add(*_KEY, {"gv_mode": "3", "consigne_eco": "620.0"})
+
+    device = {"gv_mode": "0", "consigne_eco": "608"}
+    writes.apply(_KEY, device)
+    assert device == {"gv_mode": "3", "consigne_eco": "620.0"}
+    assert len(writes) == 1
+
+    # The cloud formats numbers its own way
+    device = {"gv_mode": "3", "consigne_eco": "620"}
+    writes.apply(_KEY, device)
+    assert device == {"gv_mode": "3", "consigne_eco": "620"}
+    assert len(writes) == 0
+
+
+def test_writes_merge() -> None:
+    """Later writes to a device are merged with the unconfirmed ones."""
+    writes = PendingWrites(timedelta(minutes=10))
+    writes.add(*_KEY, {"gv_mode": "3"})
+    writes.add(*_KEY, {"consigne_eco": "620"})
+
+    device = {"gv_mode": "3", "consigne_eco": "608"}
+    writes.apply(_KEY, device)
+
+    assert device["consigne_eco"] == "620"
+    assert len(writes) == 1
+
+
+def test_expired_write_is_dropped() -> None:
+    """A write the cloud never reported stops overriding fetched data."""
+    writes = PendingWrites(timedelta(0))
+    writes.add(*_KEY, {"gv_mode": "3"})
+
+    device = {"gv_mode": "0"}
+    writes.apply(_KEY, device)
+
+    assert device == {"gv_mode": "0"}
+    assert len(writes) == 0
+
+
+def test_discard() -> None:
+    """A refused write is forgotten."""
+    writes = PendingWrites(timedelta(minutes=10))
+    writes.add(*_KEY, {"gv_mode": "3"})
+    writes.discard(*_KEY)
+
+    device = {"gv_mode": "0"}
+    writes.apply(_KEY, device)
+
+    assert device == {"gv_mode": "0"}
+    assert writes.keys() == []
@@ -0,0 +1,108 @@
+"""Tests for the adaptive polling and the phased refresh schedule."""
+
+from datetime import datetime, timedelta
+
+from custom_components.watts_vision.polling import (
+    AdaptivePollingScheduler,
+    PhasedRefreshSchedule,
+)
+
+_INTERVAL = timedelta(minutes=4)
+_HOMES = ["a", "b", "c", "d"]
+
+
+def _schedule(phase: float = 0.0) -> tuple[PhasedRefreshSchedule, datetime]:
+    """Return a schedule without jitter after the first full read."""
+    schedule = PhasedRefreshSchedule(phase, jitter=0)
+    start = schedule._start  # noqa: SLF001
+    schedule.set_homes(_HOMES)
+    schedule.refreshed(_HOMES, start, _INTERVAL)
+    return schedule, start
+
+
+def test_homes_get_evenly_spaced_slots() -> None:
+    """Every home is due on its own slot within the interval."""
+    schedule, start = _schedule()
+
+    assert schedule.next_refreshes() == {
+        "a": start + _INTERVAL,
+        "b": start + timedelta(minutes=1),
+        "c": start + timedelta(minutes=2),
+        "d": start + timedelta(minutes=3),
+    }
+    assert schedule.next_refresh() == start + timedelta(minutes=1)
+
+
+def test_due_homes() -> None:
+    """Only the homes whose slot came up, or comes up within the window, are due."""
+    schedule, start = _schedule()
+
+    assert schedule.due(start + timedelta(seconds=30)) == []
+    assert schedule.due(start + timedelta(seconds=59.5)) == ["b"]
+    assert schedule.due(start + timedelta(minutes=2)) == ["b", "c"]
+
+
+def test_refreshed_home_moves_to_next_interval() -> None:
+    """A refreshed home is due again one interval after its slot."""
+    schedule, start = _schedule()
+    now = start + timedelta(minutes=1)
+
+    schedule.refreshed(["b"], now, _INTERVAL)
+
+    assert schedule.next_refreshes()["b"] == now + _INTERVAL
+    assert schedule.next_refresh() == start + timedelta(minutes=2)
+
+
+def test_phase_shifts_slots() -> None:
+    """The phase of the account shifts the slots of all its homes."""
+    schedule, start = _schedule(phase=0.125)
+
+    assert schedule.next_refreshes()["a"] == start + timedelta(seconds=30)
+    assert schedule.next_refreshes()["b"] == start + timedelta(seconds=90)
+
+
+def test_jitter_keeps_order() -> None:
+    """The jitter delays a slot by less than the spacing between two homes."""
+    schedule = PhasedRefreshSchedule(jitter=0.2)
+    start = schedule._start  # noqa: SLF001
+    schedule.set_homes(_HOMES)
+    schedule.refreshed(_HOMES, start, _INTERVAL)
+
+    slots = schedule.next_refreshes()
+    for position, home in enumerate(["b", "c", "d", "a"], start=1):
+        slot = start + position * timedelta(minutes=1)
+        assert slot <= slots[home] <= slot + timedelta(seconds=12)
+
+
+def test_fast_polling_after_activity() -> None:
+    """Activity polls quickly, then the interval doubles back to the configured one."""
+    polling = AdaptivePollingScheduler(
+        timedelta(minutes=5), fast_interval=timedelta(seconds=30)
+    )
+    assert not polling.is_fast
+    assert polling.active_homes == set()
+
+    polling.activity(["a"])
+    assert polling.is_fast
+    assert polling.active_homes == {"a"}
+    assert polling.next_interval(1) == timedelta(seconds=30)
+
+    polling._fast_until["a"] -= 3600  # noqa: SLF001
+    assert polling.next_interval(1) == timedelta(minutes=1)
+    assert polling.next_interval(1) == timedelta(minutes=2)
+    assert polling.next_interval(1) == timedelta(minutes=4)
+    assert polling.active_homes == {"a"}
+    # Back on its slot at the configured pace
+    assert polling.next_interval(1) == timedelta(minutes=5)
+    assert polling.active_homes == set()
+
+
+def test_request_budget_bounds_interval() -> None:
+    """The interval never drops below what the hourly request budget allows."""
+    polling = AdaptivePollingScheduler(
+        timedelta(minutes=5), fast_interval=timedelta(seconds=30), request_budget=60
+    )
+    polling.activity(["a"])
+
+    assert polling.next_interval(10) == timedelta(minutes=10)
+    assert polling.refresh_interval(10) == timedelta(minutes=10)
@@ -0,0 +1,59 @@
+"""Tests for the account-wide token bucket."""
+
+import asyncio
+
+import pytest
+
+from custom_components.watts_vision.rate_limiter import TokenBucket
+from custom_components.watts_vision.request_scheduler import Priority
+
+
+async def test_burst_then_wait() -> None:
+    """The capacity is available at once, later requests wait for the refill."""
+    bucket = TokenBucket(2, 50)
+
+    await bucket.acquire()
+    await bucket.acquire()
+    assert bucket.stats()["waits"] == 0
+
+    await bucket.acquire()
+    stats = bucket.stats()
+    assert stats["acquired"] == 3
+    assert stats["waits"] == 1
+
+
+async def test_waiters_served_by_priority() -> None:
+    """A waiting interactive request gets the next token before older polls."""
+    bucket = TokenBucket(1, 20)
+    await bucket.acquire()
+    order = []
+
+    async def acquire(name: str, priority: Priority) -> None:
+        await bucket.acquire(priority)
+        order.append(name)
+
+    background = asyncio.create_task(acquire("background", Priority.BACKGROUND))
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(acquire("interactive", Priority.INTERACTIVE))
+    await asyncio.gather(background, interactive)
+
+    assert order == ["interactive", "background"]
+
+
+async def test_cancelled_waiter_hands_token_on() -> None:
+    """A token granted to a waiter cancelled before it resumed is not lost."""
+    # Tokens only come in when the test hands them out
+    bucket = TokenBucket(1, 0.001)
+    await bucket.acquire()
+    first = asyncio.create_task(bucket.acquire())
+    second = asyncio.create_task(bucket.acquire())
+    await asyncio.sleep(0)
+
+    bucket._tokens = 1  # noqa: SLF001
+    bucket._dispatch()  # noqa: SLF001
+    first.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    await asyncio.wait_for(second, 1)
+    assert bucket.stats()["acquired"] == 2
@@ -0,0 +1,64 @@
+"""Tests for the priority scheduling of outbound requests."""
+
+import asyncio
+
+import pytest
+
+from custom_components.watts_vision.request_scheduler import (
+    Priority,
+    RequestScheduler,
+)
+
+
+async def test_slots_bound_requests_in_flight() -> None:
+    """Requests beyond the slots wait, and are let through by priority."""
+    scheduler = RequestScheduler(1)
+    release = asyncio.Event()
+    order = []
+
+    async def request(name: str, priority: Priority) -> None:
+        async with scheduler.slot(priority):
+            order.append(name)
+            await release.wait()
+
+    first = asyncio.create_task(request("first", Priority.BACKGROUND))
+    await asyncio.sleep(0)
+    background = asyncio.create_task(request("background", Priority.BACKGROUND))
+    confirm = asyncio.create_task(request("confirm", Priority.CONFIRM))
+    interactive = asyncio.create_task(request("interactive", Priority.INTERACTIVE))
+    await asyncio.sleep(0)
+
+    assert scheduler.in_flight == 1
+    assert scheduler.queued == 3
+
+    release.set()
+    await asyncio.gather(first, background, confirm, interactive)
+
+    assert order == ["first", "interactive", "confirm", "background"]
+    assert scheduler.in_flight == 0
+
+
+async def test_cancelled_waiter_releases_slot() -> None:
+    """A slot handed to a waiter cancelled before it resumed goes to the next."""
+    scheduler = RequestScheduler(1)
+    release = asyncio.Event()
+
+    async def request() -> None:
+        async with scheduler.slot(Priority.BACKGROUND):
+            await release.wait()
+
+    holder = asyncio.create_task(request())
+    await asyncio.sleep(0)
+    cancelled = asyncio.create_task(request())
+    waiting = asyncio.create_task(request())
+    await asyncio.sleep(0)
+
+    release.set()
+    # The holder hands its slot to the first waiter, cancelled before it runs
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    await asyncio.wait_for(asyncio.gather(holder, waiting), 1)
+    assert scheduler.in_flight == 0
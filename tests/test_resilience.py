@@ -0,0 +1,63 @@
+"""Tests for the circuit breaker of the Watts cloud requests."""
+
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import ClientPayloadError
+
+from custom_components.watts_vision.resilience import CircuitBreaker
+from custom_components.watts_vision.watts_api import WattsApi
+
+
+def _open_breaker() -> CircuitBreaker:
+    """Return a breaker whose cool-down just passed."""
+    breaker = CircuitBreaker(1, timedelta(seconds=60))
+    breaker.record_failure()
+    breaker._opened_at -= 61  # noqa: SLF001
+    return breaker
+
+
+def _client(breaker: CircuitBreaker, error: BaseException) -> SimpleNamespace:
+    """Return a stand-in client whose request attempts raise error."""
+
+    async def post_with_retries(*_args: object) -> None:
+        raise error
+
+    return SimpleNamespace(
+        _circuitBreaker=breaker, _postWithRetries=post_with_retries, _token=None
+    )
+
+
+def test_probe_is_single_flight() -> None:
+    """Only one probe goes through once the cool-down passed."""
+    breaker = _open_breaker()
+
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+
+@pytest.mark.parametrize(
+    "error", [ClientPayloadError("truncated"), asyncio.CancelledError()]
+)
+@pytest.mark.asyncio
+async def test_probe_released_when_request_ends_without_outcome(
+    error: BaseException,
+) -> None:
+    """A probe that raises does not keep the breaker closed to all requests."""
+    breaker = _open_breaker()
+    client = _client(breaker, error)
+
+    with pytest.raises(type(error)):
+        await WattsApi._post(client, "url", {})  # noqa: SLF001
+
+    if isinstance(error, asyncio.CancelledError):
+        # Nothing was learned, the next request probes again
+        assert not breaker.is_open
+        assert breaker.allow_request()
+    else:
+        # The failed probe restarts the cool-down
+        assert breaker.is_open
+        breaker._opened_at -= 61  # noqa: SLF001
+        assert breaker.allow_request()
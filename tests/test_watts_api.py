@@ -0,0 +1,181 @@
+"""Tests for the Watts cloud client against the mock cloud."""
+
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from mock_cloud import TOKEN_PATH
+
+from custom_components.watts_vision.exceptions import WattsApiError
+from custom_components.watts_vision.request_scheduler import Priority
+from custom_components.watts_vision.watts_api import WattsApi
+
+from .conftest import CloudServer
+
+_SMARTHOME_READ = "/api/v0.1/human/smarthome/read/"
+
+
+def _cloud_device(mock_cloud: CloudServer, smarthome: str, device_id: str) -> dict:
+    """Return the device as the mock cloud stores it."""
+    for zone in mock_cloud.cloud.fleet[smarthome]["zones"]:
+        for device in zone["devices"]:
+            if device["id"] == device_id:
+                return device
+    raise KeyError(device_id)
+
+
+async def test_load_data(client: WattsApi, mock_cloud: CloudServer) -> None:
+    """The account is read with the devices of every home."""
+    assert await client.loadData()
+
+    assert len(client.getSmartHomes()) == 2
+    assert len(client.getDeviceKeys()) == 4
+    assert mock_cloud.cloud.requests[_SMARTHOME_READ] == 2
+    for key in client.getDeviceKeys():
+        assert client.getDeviceState(*key) is not None
+
+
+async def test_write_confirmed_by_refresh(
+    client: WattsApi, mock_cloud: CloudServer
+) -> None:
+    """A pushed write is shown right away and dropped once the cloud reports it."""
+    await client.loadData()
+    smarthome, device_id = sorted(client.getDeviceKeys())[0]
+    id_device = client.getDevice(smarthome, device_id)["id_device"]
+
+    client.setPendingWrite(smarthome, device_id, "700.0", "0")
+    assert client.getDeviceState(smarthome, device_id).target_temperature == 70
+    assert await client.pushTemperature(smarthome, id_device, "700.0", "0")
+
+    await client.reloadDevices(Priority.CONFIRM, {smarthome})
+
+    assert client.getDiagnostics()["pending_writes"] == 0
+    # Later changes made elsewhere show up again
+    _cloud_device(mock_cloud, smarthome, device_id)["consigne_confort"] = "650"
+    await client.reloadDevices(Priority.BACKGROUND, {smarthome})
+    assert client.getDeviceState(smarthome, device_id).target_temperature == 65
+
+
+async def test_unconfirmed_write_overlays_refresh(
+    client: WattsApi, mock_cloud: CloudServer
+) -> None:
+    """Until the cloud reports a write, refreshes keep showing the written value."""
+    await client.loadData()
+    smarthome, device_id = sorted(client.getDeviceKeys())[0]
+
+    client.setPendingWrite(smarthome, device_id, "700", "0")
+    await client.reloadDevices(Priority.BACKGROUND, {smarthome})
+
+    assert client.getDiagnostics()["pending_writes"] == 1
+    assert client.getDevice(smarthome, device_id)["consigne_confort"] == "700"
+    assert _cloud_device(mock_cloud, smarthome, device_id)["consigne_confort"] == "680"
+
+
+async def test_refused_token_renewed_once(
+    client: WattsApi, mock_cloud: CloudServer
+) -> None:
+    """A token refused before it expired is renewed and the request retried."""
+    await client.loadData()
+    logins = mock_cloud.cloud.requests[TOKEN_PATH]
+    mock_cloud.cloud.tokens.discard(client._token)  # noqa: SLF001
+
+    assert await client.reloadDevices()
+    assert mock_cloud.cloud.requests[TOKEN_PATH] == logins + 1
+
+
+async def test_failed_reads_raise(client: WattsApi, mock_cloud: CloudServer) -> None:
+    """A refresh fails when no home could be read, keeping the known data."""
+    await client.loadData()
+    smarthome, device_id = sorted(client.getDeviceKeys())[0]
+
+    mock_cloud.cloud.fleet.pop(smarthome)
+    assert not await client.reloadDevices()
+
+    mock_cloud.cloud.fleet.clear()
+    with pytest.raises(WattsApiError):
+        await client.reloadDevices()
+    assert client.getDevice(smarthome, device_id) is not None
+
+
+@pytest.mark.parametrize(
+    ("gv_mode", "reported_gv_mode"),
+    [
+        # Off pushes a manual setpoint of 0, whatever the value
+        ("1", "1"),
+        # A program reports the gv_mode of its current period
+        ("11", "8"),
+    ],
+)
+async def test_mode_write_confirmed(
+    client: WattsApi, mock_cloud: CloudServer, gv_mode: str, reported_gv_mode: str
+) -> None:
+    """A mode write is confirmed by the fields the push actually sends."""
+    await client.loadData()
+    smarthome, device_id = sorted(client.getDeviceKeys())[0]
+    id_device = client.getDevice(smarthome, device_id)["id_device"]
+
+    client.setPendingWrite(smarthome, device_id, "410.0", gv_mode)
+    assert await client.pushTemperature(smarthome, id_device, "410.0", gv_mode)
+    _cloud_device(mock_cloud, smarthome, device_id)["gv_mode"] = reported_gv_mode
+
+    await client.reloadDevices(Priority.CONFIRM, {smarthome})
+
+    assert client.getDiagnostics()["pending_writes"] == 0
+    assert client.getDevice(smarthome, device_id)["gv_mode"] == reported_gv_mode
+
+
+async def test_malformed_last_communication(client: WattsApi) -> None:
+    """A malformed last communication only fails its own home."""
+    await client.loadData()
+    good, bad = (smartHome["smarthome_id"] for smartHome in client.getSmartHomes())
+    answers = {
+        good: {"diffObj": {"days": "0", "hours": "0", "minutes": "1", "seconds": "0"}},
+        bad: {"diffObj": {"days": "0", "hours": None}},
+    }
+
+    with patch.object(
+        client, "getLastCommunication", side_effect=lambda smarthome: answers[smarthome]
+    ):
+        assert await client.reloadLastCommunications() == {good}
+
+    assert client.getLastCommunicationTime(good) is not None
+    assert client.getLastCommunicationTime(bad) is None
+
+
+async def test_reload_changed_devices(
+    client: WattsApi, mock_cloud: CloudServer
+) -> None:
+    """Only homes whose central unit reported new data are read."""
+    for home in mock_cloud.cloud.fleet.values():
+        home["last_connection"] = time.time() - 3600
+    await client.loadData()
+    smarthomes = [smartHome["smarthome_id"] for smartHome in client.getSmartHomes()]
+    reads = mock_cloud.cloud.requests[_SMARTHOME_READ]
+
+    await client.reloadChangedDevices(
+        Priority.BACKGROUND, smarthomes, timedelta(hours=2)
+    )
+    assert mock_cloud.cloud.requests[_SMARTHOME_READ] == reads
+
+    mock_cloud.cloud.fleet[smarthomes[1]]["last_connection"] = time.time()
+    await client.reloadChangedDevices(
+        Priority.BACKGROUND, smarthomes, timedelta(hours=2)
+    )
+    assert mock_cloud.cloud.requests[_SMARTHOME_READ] == reads + 1
+    assert client.getDiagnostics()["skipped_reads"] == 3
+
+
+async def test_reload_changed_devices_max_age(
+    client: WattsApi, mock_cloud: CloudServer
+) -> None:
+    """Homes are read at least once every max age, even without new data."""
+    for home in mock_cloud.cloud.fleet.values():
+        home["last_connection"] = time.time() - 3600
+    await client.loadData()
+    smarthomes = [smartHome["smarthome_id"] for smartHome in client.getSmartHomes()]
+    reads = mock_cloud.cloud.requests[_SMARTHOME_READ]
+
+    await client.reloadChangedDevices(Priority.BACKGROUND, smarthomes, timedelta(0))
+
+    assert mock_cloud.cloud.requests[_SMARTHOME_READ] == reads + 2